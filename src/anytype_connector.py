@@ -18,6 +18,34 @@ except ImportError:
     ANYTYPE_AVAILABLE = False
     print("⚠️  anytype-client not installed. Run: pip install anytype-client")
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _read_json(path: Path):
+    """Load a JSON file (orjson when installed: several times faster)"""
+    if ORJSON_AVAILABLE:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path: Path, data):
+    """Write an indented JSON file (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        with open(path, "wb") as f:
+            f.write(
+                orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            )
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
 
 class AnytypeConnector:
     """Connect to Anytype and sync objects to RAG"""
@@ -188,7 +216,8 @@ class AnytypeConnector:
         """Sync Anytype objects to RAG knowledge base"""
         print(f"\n📊 Syncing {len(objects)} objects to RAG...")
 
-        synced_count = 0
+        # doc_id -> (content, metadata); later duplicates win, as upserts would
+        pending = {}
 
         for obj in objects:
             try:
@@ -217,14 +246,8 @@ class AnytypeConnector:
 
                 # Add to knowledge base
                 doc_id = f"anytype_{extracted['id']}"
+                pending[doc_id] = (extracted["content"], clean_metadata)
 
-                kb.collection.upsert(
-                    documents=[extracted["content"]],
-                    ids=[doc_id],
-                    metadatas=[clean_metadata],
-                )
-
-                synced_count += 1
                 print(f"   ✓ Synced: {extracted['title']}")
 
             except Exception as e:
@@ -232,6 +255,18 @@ class AnytypeConnector:
                 print(f"   ⚠️  Failed to sync {obj_id}: {e}")
                 continue
 
+        # One batched embedding pass + upsert for all objects
+        try:
+            kb.add_documents_batch(
+                list(pending),
+                [content for content, _ in pending.values()],
+                [metadata for _, metadata in pending.values()],
+            )
+            synced_count = len(pending)
+        except Exception as e:
+            print(f"   ⚠️  Failed to write synced objects: {e}")
+            synced_count = 0
+
         self.stats["objects_synced"] = synced_count
         self.stats["last_sync"] = datetime.now().isoformat()
 
@@ -247,16 +282,14 @@ class AnytypeConnector:
         )
 
         try:
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(
-                    {
-                        "export_date": datetime.now().isoformat(),
-                        "object_count": len(objects),
-                        "objects": objects,
-                    },
-                    f,
-                    indent=2,
-                )
+            _write_json(
+                cache_file,
+                {
+                    "export_date": datetime.now().isoformat(),
+                    "object_count": len(objects),
+                    "objects": objects,
+                },
+            )
 
             print(f"💾 Cached {len(objects)} objects to {cache_file.name}")
             return cache_file
@@ -278,8 +311,7 @@ class AnytypeConnector:
             file_path = cache_files[-1]
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = _read_json(file_path)
 
             objects = data.get("objects", [])
             export_date = data.get("export_date", "unknown")
@@ -318,14 +350,13 @@ class AnytypeConnector:
         json_files = list(export_path.glob("**/*.json"))
         for file in json_files:
             try:
-                with open(file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                data = _read_json(file)
 
-                    # Handle different JSON structures
-                    if isinstance(data, list):
-                        objects.extend(data)
-                    else:
-                        objects.append(data)
+                # Handle different JSON structures
+                if isinstance(data, list):
+                    objects.extend(data)
+                else:
+                    objects.append(data)
 
                 print(f"   ✓ Loaded: {file.name}")
             except Exception as e:
@@ -23,6 +23,7 @@ class Config:
     OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "llama3.2")
     LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0.7"))
     LLM_MAX_TOKENS: int = int(os.getenv("LLM_MAX_TOKENS", "500"))
+    OLLAMA_KEEP_ALIVE: str = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
 
     # =============================================================================
     # API Keys (Optional)
@@ -50,6 +51,18 @@ class Config:
     # =============================================================================
     CACHE_TTL_DAYS: int = int(os.getenv("CACHE_TTL_DAYS", "90"))
 
+    # =============================================================================
+    # Search Index
+    # =============================================================================
+    # Keep the resident search index as int8 (4x less RAM, SIMD cosine)
+    RAG_INT8_INDEX: bool = os.getenv("RAG_INT8_INDEX", "false").lower() == "true"
+    # Above this many documents, search uses Chroma's HNSW index instead
+    RAG_RESIDENT_INDEX_MAX: int = int(os.getenv("RAG_RESIDENT_INDEX_MAX", "50000"))
+    # Switch Chroma's SQLite file to WAL journaling for faster bulk ingestion
+    BULK_INGEST: bool = os.getenv("BULK_INGEST", "false").lower() == "true"
+    # Only print per-folder summaries while ingesting (no line per file)
+    QUIET_INGEST: bool = os.getenv("QUIET_INGEST", "false").lower() == "true"
+
     # =============================================================================
     # Feature Flags
     # =============================================================================
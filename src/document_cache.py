@@ -5,16 +5,30 @@ Week 3 Day 18+ - Speed up document parsing with smart caching
 
 import json
 import hashlib
+import os
+import threading
 from pathlib import Path
 from typing import Dict, Optional, List
 from datetime import datetime
 
 
+def _write_json_atomic(path: Path, data):
+    """Write JSON via a temp file + rename, so readers never see half a file"""
+    tmp = path.with_name(f"{path.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
 class DocumentCache:
     """Cache parsed documents to avoid re-parsing unchanged files"""
 
-    def __init__(self, cache_dir: str = "data/cache/documents"):
+    def __init__(self, cache_dir: str = "data/cache/documents", quiet: bool = False):
         self.cache_dir = Path(cache_dir)
+        self.quiet = quiet  # No per-file hit / store lines
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
         # Load cache index
@@ -45,8 +59,7 @@ class DocumentCache:
     def _save_index(self):
         """Save cache index to disk"""
         try:
-            with open(self.index_file, "w", encoding="utf-8") as f:
-                json.dump(self.index, f, indent=2)
+            _write_json_atomic(self.index_file, self.index)
         except Exception as e:
             print(f"   ⚠️  Failed to save cache index: {e}")
 
@@ -76,7 +89,27 @@ class DocumentCache:
         if not filepath.exists():
             return None
 
-        # Calculate current file hash
+        return self._lookup(filepath)
+
+    def get_many(self, filepaths: List) -> Dict:
+        """
+        Look up many documents against the in-memory index
+
+        One stat per file; cache entries are only read for unchanged files.
+
+        Returns:
+            {filepath: cached data} for the cache hits only
+        """
+        hits = {}
+        for filepath in filepaths:
+            data = self._lookup(Path(filepath))
+            if data:
+                hits[filepath] = data
+        return hits
+
+    def _lookup(self, filepath: Path) -> Optional[Dict]:
+        """Cached data for filepath if its hash matches the index entry"""
+        # Calculate current file hash (empty if the file is gone)
         file_hash = self._get_file_hash(filepath)
 
         if not file_hash:
@@ -84,26 +117,25 @@ class DocumentCache:
             return None
 
         # Check if file is in index
-        file_key = str(filepath)
-
-        if file_key in self.index:
-            cached_hash = self.index[file_key]["hash"]
+        entry = self.index.get(str(filepath))
 
-            # Check if file changed
-            if cached_hash == file_hash:
-                # File unchanged - load from cache
-                cache_path = self._get_cache_path(file_hash)
-
-                if cache_path.exists():
-                    try:
-                        with open(cache_path, "r", encoding="utf-8") as f:
-                            data = json.load(f)
+        # Check if file changed
+        if entry and entry["hash"] == file_hash:
+            # File unchanged - load from cache
+            cache_path = self._get_cache_path(file_hash)
 
-                        self.stats["cache_hits"] += 1
-                        print(f"   ✓ Cache HIT: {filepath.name}")
-                        return data
-                    except Exception as e:
-                        print(f"   ⚠️  Cache read error: {e}")
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+
+                self.stats["cache_hits"] += 1
+                if not self.quiet:
+                    print(f"   ✓ Cache HIT: {filepath.name}")
+                return data
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"   ⚠️  Cache read error: {e}")
 
         self.stats["cache_misses"] += 1
         return None
@@ -116,23 +148,29 @@ class DocumentCache:
             filepath: Original file path
             data: Parsed document data to cache
         """
-        filepath = Path(filepath)
+        if self._store(Path(filepath), data):
+            self._save_index()
 
-        if not filepath.exists():
-            return
+    def set_many(self, items: Dict):
+        """Cache {filepath: data} for many documents, saving the index once"""
+        stored = [self._store(Path(f), data) for f, data in items.items()]
+        if any(stored):
+            self._save_index()
+
+    def _store(self, filepath: Path, data: Dict) -> bool:
+        """Write one cache entry and update the in-memory index"""
 
-        # Calculate file hash
+        # Calculate file hash (empty if the file is gone)
         file_hash = self._get_file_hash(filepath)
 
         if not file_hash:
-            return
+            return False
 
         try:
             # Save parsed data
             cache_path = self._get_cache_path(file_hash)
 
-            with open(cache_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            _write_json_atomic(cache_path, data)
 
             # Update index
             file_key = str(filepath)
@@ -143,13 +181,14 @@ class DocumentCache:
                 "file_type": data.get("file_type", "unknown"),
             }
 
-            self._save_index()
-
             self.stats["files_cached"] += 1
-            print(f"   💾 Cached: {filepath.name}")
+            if not self.quiet:
+                print(f"   💾 Cached: {filepath.name}")
+            return True
 
         except Exception as e:
             print(f"   ⚠️  Failed to cache {filepath.name}: {e}")
+            return False
 
     def invalidate(self, filepath: str):
         """Remove file from cache"""
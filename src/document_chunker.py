@@ -45,6 +45,11 @@ class DocumentChunker:
 
     def chunk_by_markdown_headings(self, text: str, source: str = "") -> List[Chunk]:
         """Split by markdown headings (#, ##, ###)"""
+        # No "#" anywhere means no headings: the whole text is one section,
+        # so skip the per-line heading regex
+        if "#" not in text:
+            return self._split_large_section(text, source, "", 0, 0)
+
         chunks = []
         chunk_id = 0
 
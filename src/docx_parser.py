@@ -23,15 +23,21 @@ except ImportError:
 class DOCXParser:
     """Extract text and metadata from Word documents"""
 
-    def __init__(self):
+    def __init__(self, quiet: bool = False):
+        self.quiet = quiet  # Silences progress output (worker processes)
         self.stats = {
             "files_processed": 0,
             "paragraphs_extracted": 0,
             "tables_extracted": 0,
         }
 
-        print(f"📝 DOCX Parser initialized")
-        print(f"   Available: {DOCX_AVAILABLE}")
+        self._log(f"📝 DOCX Parser initialized")
+        self._log(f"   Available: {DOCX_AVAILABLE}")
+
+    def _log(self, message: str):
+        """Progress output, unless quiet"""
+        if not self.quiet:
+            print(message)
 
     def parse_file(self, filepath: str) -> Optional[Dict]:
         """Parse a DOCX file and extract content + metadata"""
@@ -49,7 +55,7 @@ class DOCXParser:
             print(f"❌ Not a DOCX file: {filepath}")
             return None
 
-        print(f"\n📝 Parsing DOCX: {filepath.name}")
+        self._log(f"\n📝 Parsing DOCX: {filepath.name}")
 
         try:
             # Load document
@@ -77,7 +83,7 @@ class DOCXParser:
                 "file_type": "docx",
             }
 
-            print(
+            self._log(
                 f"   ✓ Extracted: {word_count} words, {para_count} paragraphs, {table_count} tables"
             )
 
@@ -193,7 +199,7 @@ class DOCXParser:
                 metadata["revision"] = str(core_props.revision)
 
         except Exception as e:
-            print(f"   ℹ️  Could not extract all metadata: {e}")
+            self._log(f"   ℹ️  Could not extract all metadata: {e}")
 
         return metadata
 
@@ -265,6 +271,11 @@ class DOCXParser:
         print(f"   Avg paragraphs/file: {stats['avg_paragraphs_per_file']:.1f}")
 
 
+def _parse_one(filepath: str) -> Optional[Dict]:
+    """Worker entry point for parsing DOCX files in a process pool"""
+    return DOCXParser(quiet=True).parse_file(filepath)
+
+
 # Quick test
 if __name__ == "__main__":
     print("=" * 70)
@@ -8,8 +8,9 @@ from typing import List, Dict
 
 
 class FileProcessor:
-    def __init__(self):
+    def __init__(self, quiet: bool = False):
         self.supported_formats = [".txt", ".pdf"]
+        self.quiet = quiet  # No per-file progress lines
         print("📄 File Processor initialized")
 
     def load_text_file(self, filepath: str) -> str:
@@ -85,19 +86,28 @@ class FileProcessor:
 
     def load_folder(self, folder_path: str) -> List[Dict]:
         """Load all supported files from a folder"""
-        if not os.path.exists(folder_path):
+        try:
+            # DirEntry carries the path and (usually) the file type: no stats
+            with os.scandir(folder_path) as it:
+                entries = [entry for entry in it if entry.is_file()]
+        except FileNotFoundError:
             print(f"⚠️ Folder not found: {folder_path}")
             return []
 
         files_data = []
-        for filename in os.listdir(folder_path):
-            filepath = os.path.join(folder_path, filename)
-
-            if os.path.isfile(filepath):
-                file_data = self.load_file(filepath)
-                if file_data and file_data["content"]:
-                    files_data.append(file_data)
-                    print(f"   ✓ Loaded: {filename} ({file_data['word_count']} words)")
+        for entry in entries:
+            file_data = self.load_file(entry.path)
+            if file_data and file_data["content"]:
+                files_data.append(file_data)
+
+        # One write for the whole folder
+        if files_data and not self.quiet:
+            print(
+                "\n".join(
+                    f"   ✓ Loaded: {d['filename']} ({d['word_count']} words)"
+                    for d in files_data
+                )
+            )
 
         return files_data
 
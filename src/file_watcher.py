@@ -4,60 +4,155 @@ Week 1 Day 5 - Auto-update RAG when files change
 """
 
 import os
-import time
+import queue
+import re
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from rag_engine import KnowledgeBase
 from file_processor import FileProcessor
 
 
+# System, editor swap and temp files never reach the knowledge base
+IGNORED_FILES = re.compile(r"(^\.|\.swp$|\.tmp$|~$)")
+
+
 class CareerKnowledgeHandler(FileSystemEventHandler):
     """Handles file system events for career knowledge folders"""
 
-    def __init__(self, kb: KnowledgeBase):
+    def __init__(
+        self, kb: KnowledgeBase, debounce_seconds: float = 0.5, read_workers: int = 8
+    ):
         self.kb = kb
         self.processor = FileProcessor()
+
+        # Debounce: {filepath: pending Timer}; bursts collapse to one ingest
+        self.debounce_seconds = debounce_seconds
+        self._pending = {}
+        self._lock = threading.Lock()
+
+        # Settled files queue up for a single ingest worker, which reads
+        # everything waiting concurrently and upserts it in one batch
+        self._ingest_queue = queue.Queue()
+        self._readers = ThreadPoolExecutor(max_workers=read_workers)
+        self._ingest_thread = threading.Thread(target=self._ingest_loop, daemon=True)
+        self._ingest_thread.start()
+
         print("👁️  File Watcher Handler initialized")
 
-    def on_created(self, event):
-        """Called when a file is created"""
-        if event.is_directory:
-            return
+    def _is_ignored(self, event) -> bool:
+        """Skip directories and system/temp files"""
+        return event.is_directory or bool(
+            IGNORED_FILES.search(os.path.basename(event.src_path))
+        )
+
+    def _schedule(self, filepath: str, action: str):
+        """(Re)start the debounce timer for a path"""
+        with self._lock:
+            timer = self._pending.pop(filepath, None)
+            if timer:
+                timer.cancel()
+                # Keep the first action of a burst ("created" beats "updated")
+                action = timer.args[1]
+
+            timer = threading.Timer(
+                self.debounce_seconds, self._flush, args=(filepath, action)
+            )
+            timer.daemon = True
+            self._pending[filepath] = timer
+            timer.start()
+
+    def _flush(self, filepath: str, action: str):
+        """Process a path once its event burst has settled"""
+        with self._lock:
+            self._pending.pop(filepath, None)
 
-        filepath = event.src_path
         filename = os.path.basename(filepath)
+        if action == "created":
+            print(f"\n📥 NEW FILE DETECTED: {filename}")
+        else:
+            print(f"\n✏️  FILE UPDATED: {filename}")
+
+        self._ingest_queue.put((filepath, action))
 
-        # Ignore system files
-        if filename.startswith("."):
+    def _ingest_loop(self):
+        """Worker: ingest queued files, batching whatever arrived meanwhile"""
+        while True:
+            item = self._ingest_queue.get()
+            if item is None:
+                return
+
+            batch = {item[0]: item[1]}
+            try:
+                while True:
+                    item = self._ingest_queue.get_nowait()
+                    if item is None:
+                        self._ingest_queue.put(None)  # Stop after this batch
+                        break
+                    batch.setdefault(item[0], item[1])
+            except queue.Empty:
+                pass
+
+            self._process_files(list(batch.items()))
+
+    def cancel_pending(self):
+        """Drop all scheduled (not yet processed) events"""
+        with self._lock:
+            for timer in self._pending.values():
+                timer.cancel()
+            self._pending.clear()
+
+    def shutdown(self):
+        """Cancel pending events and stop the ingest worker"""
+        self.cancel_pending()
+        self._ingest_queue.put(None)
+        self._ingest_thread.join()
+        self._readers.shutdown()
+
+    def on_created(self, event):
+        """Called when a file is created"""
+        if self._is_ignored(event):
             return
 
-        print(f"\n📥 NEW FILE DETECTED: {filename}")
-        self._process_file(filepath, action="created")
+        self._schedule(event.src_path, action="created")
 
     def on_modified(self, event):
         """Called when a file is modified"""
-        if event.is_directory:
+        if self._is_ignored(event):
             return
 
-        filepath = event.src_path
-        filename = os.path.basename(filepath)
+        self._schedule(event.src_path, action="updated")
 
-        if filename.startswith("."):
+    def on_closed(self, event):
+        """Called when a file opened for writing is closed (IN_CLOSE_WRITE)"""
+        if self._is_ignored(event):
             return
 
-        print(f"\n✏️  FILE UPDATED: {filename}")
-        self._process_file(filepath, action="updated")
+        self._schedule(event.src_path, action="updated")
+
+    def on_moved(self, event):
+        """Called on rename (editors often save via temp file + rename)"""
+        if event.is_directory:
+            return
+
+        if not IGNORED_FILES.search(os.path.basename(event.dest_path)):
+            self._schedule(event.dest_path, action="created")
 
     def on_deleted(self, event):
         """Called when a file is deleted"""
-        if event.is_directory:
+        if self._is_ignored(event):
             return
 
         filepath = event.src_path
         filename = os.path.basename(filepath)
 
-        if filename.startswith("."):
-            return
+        # A pending ingest for a deleted file is moot
+        with self._lock:
+            timer = self._pending.pop(filepath, None)
+            if timer:
+                timer.cancel()
 
         print(f"\n🗑️  FILE DELETED: {filename}")
 
@@ -65,44 +160,54 @@ class CareerKnowledgeHandler(FileSystemEventHandler):
         doc_id = self._get_doc_id(filename, filepath)
         try:
             self.kb.collection.delete(ids=[doc_id])
+            self.kb.invalidate_index()
             print(f"   ✓ Removed from knowledge base")
         except Exception as e:
             print(f"   ⚠️ Deletion note: {e}")
 
-    def _process_file(self, filepath: str, action: str):
-        """Process file and update knowledge base"""
-        # Wait a moment for file write to complete
-        time.sleep(0.5)
-
-        # Load file
-        file_data = self.processor.load_file(filepath)
-
-        if not file_data or not file_data["content"]:
-            print(f"   ⚠️ Could not process file")
+    def _process_files(self, items: list):
+        """Process settled files and update knowledge base in one upsert"""
+        # Skip files deleted while queued
+        items = [(path, action) for path, action in items if os.path.exists(path)]
+        if not items:
             return
 
-        # Determine document type
-        doc_type = self._classify_document(filepath, file_data["content"])
+        # Load files concurrently (debounce already waited for writes to settle)
+        loaded = self._readers.map(self.processor.load_file, [p for p, _ in items])
+
+        documents, ids, metadatas = [], [], []
+        for (filepath, action), file_data in zip(items, loaded):
+            if not file_data or not file_data["content"]:
+                print(f"   ⚠️ Could not process {os.path.basename(filepath)}")
+                continue
+
+            # Determine document type
+            doc_type = self._classify_document(filepath, file_data["content"])
+
+            documents.append(file_data["content"])
+            ids.append(self._get_doc_id(file_data["filename"], filepath))
+            metadatas.append(
+                {
+                    "source": file_data["filename"],
+                    "type": doc_type,
+                    "word_count": file_data["word_count"],
+                    "action": action,
+                }
+            )
+            print(
+                f"   ✓ {file_data['filename']}: indexed as '{doc_type}' "
+                f"({file_data['word_count']} words)"
+            )
 
-        # Generate document ID
-        doc_id = self._get_doc_id(file_data["filename"], filepath)
+        if not documents:
+            return
 
-        # Upsert to vector DB
+        # Same write path as the loaders: skip unchanged content, embed once
         try:
-            self.kb.collection.upsert(
-                documents=[file_data["content"]],
-                ids=[doc_id],
-                metadatas=[
-                    {
-                        "source": file_data["filename"],
-                        "type": doc_type,
-                        "word_count": file_data["word_count"],
-                        "action": action,
-                    }
-                ],
-            )
+            if not self.kb.add_changed_documents(ids, documents, metadatas):
+                print("   ⏭️  No changes since last index, skipped")
+                return
 
-            print(f"   ✓ Indexed as '{doc_type}' ({file_data['word_count']} words)")
             print(
                 f"   💾 Knowledge base now has {self.kb.collection.count()} documents"
             )
@@ -148,9 +253,10 @@ class CareerKnowledgeHandler(FileSystemEventHandler):
 class FileWatcher:
     """Main file watcher orchestrator"""
 
-    def __init__(self, watch_paths: list):
+    def __init__(self, watch_paths: list, kb: KnowledgeBase | None = None):
         self.watch_paths = watch_paths
-        self.kb = KnowledgeBase()
+        # Reuse the caller's knowledge base instead of opening a second client
+        self.kb = kb or KnowledgeBase()
         self.observer = Observer()
 
         # Setup event handler
@@ -179,6 +285,7 @@ class FileWatcher:
         """Stop watching"""
         self.observer.stop()
         self.observer.join()
+        self.handler.shutdown()
         print("\n🛑 File Watcher stopped")
 
 
@@ -190,13 +297,11 @@ if __name__ == "__main__":
     # Create watcher
     watcher = FileWatcher(watch_folders)
 
-    try:
-        # Start monitoring
-        watcher.start()
-
-        # Keep running
-        while True:
-            time.sleep(1)
+    # Block until Ctrl+C instead of polling with sleep
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
 
-    except KeyboardInterrupt:
-        watcher.stop()
+    # Start monitoring
+    watcher.start()
+    stop_event.wait()
+    watcher.stop()
@@ -301,12 +301,11 @@ class ImageOCR:
             print(f"❌ Folder not found: {folder_path}")
             return []
 
-        # Find all image files
-        image_extensions = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.bmp", "*.tiff"]
-        image_files = []
-
-        for ext in image_extensions:
-            image_files.extend(folder.glob(f"**/{ext}"))
+        # Find all image files (one directory walk, filtered by suffix)
+        image_extensions = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff"}
+        image_files = [
+            f for f in folder.rglob("*") if f.suffix.lower() in image_extensions
+        ]
 
         if not image_files:
             print(f"⚠️  No image files found in {folder_path}")
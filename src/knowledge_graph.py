@@ -7,14 +7,22 @@ from rag_engine import KnowledgeBase
 from markdown_parser import MarkdownParser
 from typing import Dict, List, Set, Optional
 import os
+import pickle
+import sys
 from collections import defaultdict, deque
+from itertools import islice
+from pathlib import Path
+import numpy as np
 
 
 class KnowledgeGraph:
     """Build and query knowledge graph from wikilinks"""
 
-    def __init__(self, kb: KnowledgeBase):
+    def __init__(
+        self, kb: KnowledgeBase, cache_path: str = "data/cache/knowledge_graph.pkl"
+    ):
         self.kb = kb
+        self.cache_path = cache_path
         self.parser = MarkdownParser()
 
         # Graph structure: {node: [connected_nodes]}
@@ -26,46 +34,128 @@ class KnowledgeGraph:
         # Reverse index: {target: [sources that link to it]}
         self.backlinks = defaultdict(list)
 
+        # File fingerprints: {filepath: (folder, mtime, size)}
+        self.fingerprints = {}
+
+        # Unique edge count, maintained as edges are added/removed
+        self._edge_count = 0
+
+        # Integer-ID arrays for traversal, rebuilt lazily after changes
+        self._compiled = False
+
         print("🕸️  Knowledge Graph initialized")
 
-    def build_from_vault(self, vault_path: str):
+    def build_from_vault(self, vault_path: str, use_cache: bool = True):
         """Build graph by scanning Obsidian vault"""
         print(f"\n🔍 Scanning vault: {vault_path}")
 
-        folders_to_scan = ["daily", "skills", "goals", "research", "projects"]
-        total_nodes = 0
-        total_edges = 0
+        # Restore previous build, then only re-parse changed notes
+        if use_cache:
+            self._load_sidecar()
 
-        for folder in folders_to_scan:
-            folder_path = os.path.join(vault_path, folder)
+        folders_to_scan = {"daily", "skills", "goals", "research", "projects"}
+        total_nodes = 0
+        notes_parsed = 0
+        notes_removed = 0
+        seen_files = set()
+
+        # Single glob walk over vault subfolders (follows symlinked folders)
+        for note_path in Path(vault_path).glob("*/*.md"):
+            folder = note_path.parent.name
+            if folder not in folders_to_scan:
+                continue
 
-            # Resolve symlink if exists
-            real_path = os.path.realpath(folder_path)
+            filepath = str(note_path)
+            stat = note_path.stat()
+            fingerprint = (folder, stat.st_mtime, stat.st_size)
+            seen_files.add(filepath)
+            total_nodes += 1
 
-            if not os.path.exists(real_path):
+            if self.fingerprints.get(filepath) == fingerprint:
                 continue
 
-            print(f"   Scanning: {folder}/")
+            # New or changed note - drop stale edges before re-adding
+            if filepath in self.fingerprints:
+                self._remove_note_from_graph(filepath)
 
-            for filename in os.listdir(real_path):
-                if not filename.endswith(".md"):
-                    continue
+            self._add_note_to_graph(filepath, folder)
+            self.fingerprints[filepath] = fingerprint
+            notes_parsed += 1
 
-                filepath = os.path.join(real_path, filename)
-                self._add_note_to_graph(filepath, folder)
-                total_nodes += 1
+        # Drop notes deleted since the last build
+        for filepath in set(self.fingerprints) - seen_files:
+            self._remove_note_from_graph(filepath)
+            del self.fingerprints[filepath]
+            notes_removed += 1
 
-        # Count edges
-        for node, connections in self.graph.items():
-            total_edges += len(connections)
+        if use_cache and (notes_parsed or notes_removed):
+            self._save_sidecar()
 
         print(f"\n✅ Graph built:")
         print(f"   Nodes: {total_nodes}")
-        print(f"   Edges: {total_edges}")
+        print(f"   Edges: {self._edge_count}")
         print(f"   Unique concepts: {len(self.nodes)}")
+        print(f"   Notes parsed: {notes_parsed} ({total_nodes - notes_parsed} unchanged)")
 
         return self
 
+    def _load_sidecar(self) -> bool:
+        """Restore graph from the binary sidecar of the previous build"""
+        if not os.path.exists(self.cache_path):
+            return False
+
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = pickle.load(f)
+
+            self.graph = defaultdict(list, data["graph"])
+            self.backlinks = defaultdict(list, data["backlinks"])
+            self.nodes = data["nodes"]
+            self.fingerprints = data["fingerprints"]
+            self._edge_count = sum(map(len, self.graph.values()))
+            self._compiled = False
+            return True
+
+        except Exception as e:
+            print(f"   ⚠️ Graph cache read error: {e}")
+            return False
+
+    def _save_sidecar(self):
+        """Save built graph and file fingerprints for instant reload"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "wb") as f:
+                pickle.dump(
+                    {
+                        "graph": dict(self.graph),
+                        "backlinks": dict(self.backlinks),
+                        "nodes": self.nodes,
+                        "fingerprints": self.fingerprints,
+                    },
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+        except Exception as e:
+            print(f"   ⚠️ Graph cache write error: {e}")
+
+    def _remove_note_from_graph(self, filepath: str):
+        """Remove a note's node and outgoing edges from the graph"""
+        folder = self.fingerprints[filepath][0]
+        node_id = self._create_node_id(os.path.basename(filepath), folder)
+
+        outgoing = self.graph.pop(node_id, [])
+        self._edge_count -= len(outgoing)
+        self._compiled = False
+
+        for target_id in outgoing:
+            sources = self.backlinks.get(target_id)
+            if sources and node_id in sources:
+                sources.remove(node_id)
+                if not sources:
+                    del self.backlinks[target_id]
+
+        self.nodes.pop(node_id, None)
+
     def _add_note_to_graph(self, filepath: str, folder: str):
         """Add single note to graph"""
         parsed = self.parser.parse_file(filepath)
@@ -74,6 +164,7 @@ class KnowledgeGraph:
 
         # Create node ID (clean name)
         node_id = self._create_node_id(parsed["filename"], folder)
+        self._compiled = False
 
         # Store node metadata
         self.nodes[node_id] = {
@@ -94,6 +185,7 @@ class KnowledgeGraph:
             # Add edge
             if target_id not in self.graph[node_id]:
                 self.graph[node_id].append(target_id)
+                self._edge_count += 1
 
             # Add backlink
             if node_id not in self.backlinks[target_id]:
@@ -102,7 +194,8 @@ class KnowledgeGraph:
     def _create_node_id(self, filename: str, folder: str) -> str:
         """Create consistent node ID"""
         clean_name = filename.replace(".md", "")
-        return f"{folder}/{clean_name}"
+        # Intern so nodes, edges and backlinks share one string object
+        return sys.intern(f"{folder}/{clean_name}")
 
     def _normalize_wikilink(self, link: str) -> str:
         """Normalize wikilink to node ID format"""
@@ -111,10 +204,12 @@ class KnowledgeGraph:
             parts = link.split("/")
             folder = parts[0].lower()
             name = "/".join(parts[1:])
-            return f"{folder}/{name}"
+            node_id = f"{folder}/{name}"
         else:
             # Guess folder based on common patterns
-            return self._guess_node_folder(link)
+            node_id = self._guess_node_folder(link)
+
+        return sys.intern(node_id)
 
     def _guess_node_folder(self, name: str) -> str:
         """Guess folder for node without path"""
@@ -138,30 +233,78 @@ class KnowledgeGraph:
             "metadata": self.nodes.get(node_id, {}),
         }
 
+    def _compile(self):
+        """Build integer-ID adjacency arrays (SoA) for fast traversal"""
+        if self._compiled:
+            return
+
+        # Every ID: notes plus link targets that have no note yet
+        self._id_names = list(
+            dict.fromkeys([*self.nodes, *self.graph, *self.backlinks])
+        )
+        self._id_of = {name: i for i, name in enumerate(self._id_names)}
+
+        # Node types as a small int vector indexed by ID
+        types = sorted({node_data["type"] for node_data in self.nodes.values()})
+        self._type_names = ["unknown", *types]
+        type_code = {name: code for code, name in enumerate(self._type_names)}
+        self._type_arr = np.zeros(len(self._id_names), dtype=np.int8)
+        for node_id, node_data in self.nodes.items():
+            self._type_arr[self._id_of[node_id]] = type_code[node_data["type"]]
+
+        # Undirected adjacency (outgoing + incoming), one int32 array per ID
+        id_of = self._id_of
+        self._adj = [
+            np.array(
+                sorted(
+                    {id_of[n] for n in self.graph.get(name, ())}
+                    | {id_of[n] for n in self.backlinks.get(name, ())}
+                ),
+                dtype=np.int32,
+            )
+            for name in self._id_names
+        ]
+
+        self._compiled = True
+
+    def node_type(self, node_id: str) -> str:
+        """Type (folder) of a node, 'unknown' for link-only targets"""
+        self._compile()
+        index = self._id_of.get(node_id)
+        if index is None:
+            return "unknown"
+        return self._type_names[self._type_arr[index]]
+
     def find_path(self, start: str, end: str) -> Optional[List[str]]:
         """Find shortest path between two nodes (BFS)"""
         if start not in self.nodes or end not in self.nodes:
             return None
 
-        # BFS to find shortest path
-        queue = deque([(start, [start])])
-        visited = {start}
+        self._compile()
+        start_id = self._id_of[start]
+        end_id = self._id_of[end]
+
+        # BFS over int IDs; parent array replaces per-step path copies
+        parent = np.full(len(self._id_names), -1, dtype=np.int32)
+        parent[start_id] = start_id
+        queue = deque([start_id])
 
         while queue:
-            current, path = queue.popleft()
+            current = queue.popleft()
 
-            if current == end:
-                return path
+            if current == end_id:
+                # Walk parents back to the start
+                path = [current]
+                while current != start_id:
+                    current = int(parent[current])
+                    path.append(current)
+                return [self._id_names[i] for i in reversed(path)]
 
             # Check BOTH outgoing AND incoming connections (bidirectional)
-            neighbors = set(self.graph.get(current, [])) | set(
-                self.backlinks.get(current, [])
-            )
-
-            for neighbor in neighbors:
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, path + [neighbor]))
+            for neighbor in self._adj[current].tolist():
+                if parent[neighbor] == -1:
+                    parent[neighbor] = current
+                    queue.append(neighbor)
 
         return None  # No path found
 
@@ -196,11 +339,12 @@ class KnowledgeGraph:
     def get_node_stats(self) -> Dict:
         """Get graph statistics"""
         # Most connected nodes
-        connection_counts = {}
-        for node in self.nodes.keys():
-            outgoing = len(self.graph.get(node, []))
-            incoming = len(self.backlinks.get(node, []))
-            connection_counts[node] = outgoing + incoming
+        graph_get = self.graph.get
+        backlinks_get = self.backlinks.get
+        connection_counts = {
+            node: len(graph_get(node, ())) + len(backlinks_get(node, ()))
+            for node in self.nodes
+        }
 
         top_nodes = sorted(connection_counts.items(), key=lambda x: x[1], reverse=True)[
             :5
@@ -213,13 +357,13 @@ class KnowledgeGraph:
 
         return {
             "total_nodes": len(self.nodes),
-            "total_edges": sum(len(edges) for edges in self.graph.values()),
+            "total_edges": self._edge_count,
             "top_connected": top_nodes,
             "nodes_by_type": dict(type_counts),
             "isolated_nodes": [
                 n
                 for n in self.nodes
-                if not self.graph.get(n) and not self.backlinks.get(n)
+                if not graph_get(n) and not backlinks_get(n)
             ],
         }
 
@@ -258,7 +402,7 @@ class KnowledgeGraph:
             related = self.find_related_nodes(node_id, max_depth=2)
             if related:
                 print(f"\n   🔗 Related nodes (2 hops): {len(related)}")
-                for rel in list(related)[:5]:
+                for rel in islice(related, 5):
                     print(f"      • {rel}")
 
         print("=" * 60)
@@ -3,17 +3,56 @@ Local LLM Engine using Ollama
 Week 1 Day 2 - My economist -< freelancer brain
 """
 
+import re
+import time
 import ollama
 from config import Config
 
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _keep_alive_seconds(value) -> float:
+    """Ollama keep_alive ("30m", "1h30m", "300", "-1") in seconds"""
+    text = str(value).strip()
+    try:
+        seconds = float(text)
+    except ValueError:
+        parts = _DURATION_PART.findall(text)
+        if not parts or "".join(n + u for n, u in parts) != text.lstrip("-"):
+            return 0.0  # Unknown format: never assume the model is loaded
+        seconds = sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+        if text.startswith("-"):
+            seconds = -seconds
+    # Negative keep_alive keeps the model loaded indefinitely
+    return float("inf") if seconds < 0 else seconds
+
 
 class LocalLLM:
+    # Fixed instruction blocks, placed right after the system prompt and
+    # before any variable context so Ollama reuses their KV cache
+    PROMPT_PREFIXES = {
+        "job_fit": """Analyze this job posting against my skills:
+
+1. What skills do I already have that match? (be specific)
+2. What are my top 3 skill gaps?
+3. What's my estimated readiness? (0-100%)
+4. What should I learn THIS WEEK to improve fit?
+
+Be direct and actionable.""",
+    }
+
     def __init__(self, model="llama3.2"):
         # Use config instead of hardcoded values
         self.model = Config.OLLAMA_MODEL
         self.host = Config.OLLAMA_HOST
         self.temperature = Config.LLM_TEMPERATURE
         self.max_tokens = Config.LLM_MAX_TOKENS
+        self.keep_alive = Config.OLLAMA_KEEP_ALIVE
+        self._keep_alive_s = _keep_alive_seconds(self.keep_alive)
+
+        # monotonic() of the last successful request (model known loaded)
+        self._last_used = None
 
         self.system_prompt = """You are an AI Career Coach specializing in helping 
         economists transition to Python programming careers in finance.
@@ -34,14 +73,22 @@ Your role:
         print(f"   Host: {self.host}")
         print(f"   Temperature: {self.temperature}")
 
-    def chat(self, user_message, context=None):
-        """Send message to local LLM and get response"""
+    def chat(self, user_message, context=None, system_prefix_id=None):
+        """Send message to local LLM and get response
+
+        system_prefix_id selects a fixed instruction block from
+        PROMPT_PREFIXES; stable text goes first so the prefix is reused.
+        """
 
-        # Build full prompt with context
+        # Build full prompt: fixed parts first, then context and message
+        parts = [self.system_prompt]
+        if system_prefix_id:
+            parts.append(self.PROMPT_PREFIXES[system_prefix_id])
         if context:
-            full_prompt = f"{self.system_prompt}\n\nContext: {context}\n\nUser: {user_message}\n\nCoach:"
-        else:
-            full_prompt = f"{self.system_prompt}\n\nUser: {user_message}\n\nCoach:"
+            parts.append(f"Context: {context}")
+        parts.append(f"User: {user_message}")
+        parts.append("Coach:")
+        full_prompt = "\n\n".join(parts)
 
         try:
             # Call Ollama
@@ -52,13 +99,34 @@ Your role:
                     "temperature": 0.7,  # Balanced creativity
                     "num_predict": 200,  # Max tokens
                 },
+                keep_alive=self.keep_alive,  # Keep model + prompt cache loaded
             )
 
+            self._last_used = time.monotonic()
             return response["response"].strip()
 
         except Exception as e:
             return f"⚠️ LLM Error: {e}\n\nTip: Is Ollama running? Try: ollama serve"
 
+    def warm_up(self) -> bool:
+        """Load the model into Ollama's memory without generating anything
+
+        Ollama treats an empty prompt as a load request, so this can run
+        alongside retrieval and hide model load time from the first chat.
+        """
+        try:
+            ollama.generate(model=self.model, prompt="", keep_alive=self.keep_alive)
+            self._last_used = time.monotonic()
+            return True
+        except Exception:
+            return False  # chat() reports connection problems
+
+    def needs_warm_up(self) -> bool:
+        """True unless a request within keep_alive left the model loaded"""
+        if self._last_used is None:
+            return True
+        return time.monotonic() - self._last_used >= self._keep_alive_s
+
 
 # Quick test
 if __name__ == "__main__":
@@ -3,6 +3,10 @@ AI Career Coach - Week 1 Day 3
 Now with personal knowledge base (RAG)!
 """
 
+import hashlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List
 from llm_engine import LocalLLM
@@ -14,6 +18,30 @@ from query_cache import QueryCache
 from config import Config
 from anytype_connector import AnytypeConnector
 
+# Proficiency bars for 0-10, built once
+_BARS = ["█" * i + "░" * (10 - i) for i in range(11)]
+
+_READINESS_PROMPT = (
+    "I need to learn these skills: {skills}. "
+    "Give me a 2-week action plan (3 bullet points max)."
+)
+
+
+class _Out:
+    """Collects report lines and writes them to stdout in one call"""
+
+    def __init__(self):
+        self.lines = []
+
+    def emit(self, s=""):
+        self.lines.append(s)
+
+    def flush(self):
+        if self.lines:
+            sys.stdout.write("\n".join(self.lines) + "\n")
+            sys.stdout.flush()
+            self.lines = []
+
 
 class CareerCoach:
     def __init__(self):
@@ -29,8 +57,12 @@ class CareerCoach:
         enable_anytype = Config.ENABLE_ANYTYPE_SYNC
         enable_cache = Config.ENABLE_CACHE
 
-        # Initialize local LLM
-        self.llm = LocalLLM()
+        # Local LLM is created on first use (see llm property)
+        self._llm = None
+
+        # Background work overlapped with retrieval (e.g. model warm-up),
+        # created on first use and shut down by stop_monitoring()
+        self._pool = None
 
         # Initialize rag engine
         self.kb = KnowledgeBase()
@@ -42,7 +74,7 @@ class CareerCoach:
                 "data/monitored_folders/job_posts",
                 "data/knowledge_base/skills",
             ]
-            self.watcher = FileWatcher(watch_folders)
+            self.watcher = FileWatcher(watch_folders, kb=self.kb)
 
         # Skills tracker
         self.skills_tracker = SkillsTracker(self.kb)
@@ -70,6 +102,35 @@ class CareerCoach:
         if enable_watcher:
             print(f"👁️  File Watcher: ENABLED")
 
+    @property
+    def llm(self):
+        """Local LLM, initialized on first use so watch-only runs skip it"""
+        if self._llm is None:
+            self._llm = LocalLLM()
+        return self._llm
+
+    def _stable_hash(self, name: str, prompt: str, folders: List[str]) -> str:
+        """Content-addressed cache key: input files + prompt + model
+
+        Changes to any file under the given folders give a new key, so a
+        cached analysis is reused only while its inputs are unchanged.
+        """
+        digest = hashlib.sha256(f"{Config.OLLAMA_MODEL}|{prompt}".encode())
+        for folder in folders:
+            if not os.path.isdir(folder):
+                continue
+            for filename in sorted(os.listdir(folder)):
+                filepath = os.path.join(folder, filename)
+                if os.path.isfile(filepath):
+                    digest.update(filename.encode())
+                    with open(filepath, "rb") as f:
+                        digest.update(f.read())
+        return f"{name}:{digest.hexdigest()}"
+
+    def _cacheable(self, response: str) -> bool:
+        """Only real LLM answers are worth caching (not error messages)"""
+        return self.cache is not None and not response.startswith("⚠️")
+
     def sync_anytype(self):
         """Sync Anytype workspace to knowledge base"""
         if not self.anytype:
@@ -134,15 +195,26 @@ class CareerCoach:
             print("⚠️ File watcher not enabled")
 
     def stop_monitoring(self):
-        """Stop file monitoring"""
+        """Stop file monitoring and background workers"""
         if self.watcher:
             self.watcher.stop()
+        self.skills_tracker.flush()
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _warm_up_llm(self):
+        """Load the model in the background unless it is still loaded"""
+        if not self.llm.needs_warm_up():
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=2)
+        self._pool.submit(self.llm.warm_up)
 
     def load_knowledge(self):
         """Load personal knowledge into vector DB"""
         print("\n📚 Loading your skills, goals, knowledge sources...")
-        self.kb.load_knowledge_files()
-        self.kb.load_job_posts()
+        self.kb.load_knowledge_and_job_posts()
 
         # Load PDF files
         print("\n--- Loadig PDF Documents ---")
@@ -154,11 +226,13 @@ class CareerCoach:
 
     def chat(self, message):
         """Chat with AI coach using local LLM"""
+        self.kb.begin_turn()
         self.user_profile["session_count"] += 1
 
         print(f"\n💬 You: {message}")
 
-        # Search knowledge base for relevant context
+        # Search knowledge base while the model loads
+        self._warm_up_llm()
         relevant_context = self.kb.search(message, n_results=2)
 
         # Get response from LLM with retrieved context
@@ -169,55 +243,78 @@ class CareerCoach:
 
     def analyze_skills_gap(self):
         """Special analysis: What skills to learn?"""
+        self.kb.begin_turn()
         print("\n🔍 Running Skills Gap Analysis...")
         query = "Compare my current economics and Python skills to my transition goals."
-        context = self.kb.search(query, n_results=3)
         prompt = "Based on my current skills and goals, what are the top 3 Python skills I should focus on this month? Be specific."
+
+        # Same skills files + prompt -> same answer; skip RAG + LLM
+        cache_key = None
+        if self.cache:
+            cache_key = self._stable_hash(
+                "skills_gap",
+                query + prompt,
+                [os.path.join(Config.KNOWLEDGE_BASE_PATH, "skills")],
+            )
+            cached = self.cache.get(cache_key)
+            if cached:
+                print(f"🤖 Coach Analysis (cached):\n{cached}")
+                return
+
+        context = self.kb.search(query, n_results=3)
         response = self.llm.chat(prompt, context=context)
 
+        if cache_key and self._cacheable(response):
+            self.cache.set(cache_key, response, ttl_days=30)
+
         print(f"🤖 Coach Analysis:\n{response}")
 
     def show_skills_report(self):
         """Display weekly skills progress"""
-        print("\n" + self.skills_tracker.generate_progress_report())
+        print()
+        self.skills_tracker.print_progress_report()
 
     def analyze_job_readiness(self, job_skills: List[str]):
         """Analyze readiness for job based on skills"""
-        print(f"\n🎯 JOB READINESS ANALYSIS")
-        print("=" * 60)
+        self.kb.begin_turn()
+        out = _Out()
+        out.emit(f"\n🎯 JOB READINESS ANALYSIS")
+        out.emit("=" * 60)
 
         comparison = self.skills_tracker.compare_with_job_requirements(job_skills)
 
         # Display results
-        print(f"\n📊 Readiness Score: {comparison['readiness_score']}%")
-        print(
+        out.emit(f"\n📊 Readiness Score: {comparison['readiness_score']}%")
+        out.emit(
             f"   Skills Matched: {comparison['skills_matched']}/{comparison['total_required']}"
         )
 
         if comparison["matches"]:
-            print(f"\n✅ Skills You Have:")
+            out.emit(f"\n✅ Skills You Have:")
             for match in sorted(
                 comparison["matches"], key=lambda x: x["proficiency"], reverse=True
             ):
-                bar = "█" * match["proficiency"] + "░" * (10 - match["proficiency"])
-                print(f"   {match['skill']:<15} [{bar}] {match['proficiency']}/10")
+                bar = _BARS[min(max(match["proficiency"], 0), 10)]
+                out.emit(f"   {match['skill']:<15} [{bar}] {match['proficiency']}/10")
 
         if comparison["gaps"]:
-            print(f"\n❌ Skills to Learn:")
+            out.emit(f"\n❌ Skills to Learn:")
             for gap in comparison["gaps"]:
-                print(f"   - {gap['skill']}")
+                out.emit(f"   - {gap['skill']}")
 
             # Get LLM recommendation
-            gaps_list = [g["skill"] for g in comparison["gaps"]]
-            prompt = f"I need to learn these skills: {', '.join(gaps_list)}. Give me a 2-week action plan (3 bullet points max)."
+            prompt = _READINESS_PROMPT.format(
+                skills=", ".join(g["skill"] for g in comparison["gaps"])
+            )
 
             context = f"Current skills: {[m['skill'] for m in comparison['matches']]}"
             recommendation = self.llm.chat(prompt, context=context)
 
-            print(f"\n🤖 Coach Recommendation:")
-            print(f"   {recommendation}")
+            out.emit(f"\n🤖 Coach Recommendation:")
+            out.emit(f"   {recommendation}")
 
-        print("=" * 60)
+        out.emit("=" * 60)
+        out.flush()
 
     def get_stats(self):
         """Show session statistics"""
@@ -227,36 +324,65 @@ class CareerCoach:
 
     def analyze_job_fit(self, job_name="python_finance_analyst"):
         """Analyze fit for a specific job"""
-        print(f"\n🎯 Analyzing Job Fit: {job_name}")
-        print("=" * 60)
+        self.kb.begin_turn()
+        out = _Out()
+        out.emit(f"\n🎯 Analyzing Job Fit: {job_name}")
+        out.emit("=" * 60)
 
-        # Get job requirements
         job_query = f"job_{job_name} requirements skills responsibilities"
-        job_context = self.kb.search(job_query, n_results=1)
-
-        # Get your skills
         skills_query = "my economics expertise python skills current level"
-        skills_context = self.kb.search(skills_query, n_results=2)
+        prompt = f"Analyze my fit for {job_name}."
+
+        # Same job posts + skills files + prompt -> same answer; skip RAG + LLM
+        cache_key = None
+        if self.cache:
+            cache_key = self._stable_hash(
+                f"job_fit_{job_name}",
+                "\n".join(
+                    [
+                        job_query,
+                        skills_query,
+                        prompt,
+                        LocalLLM.PROMPT_PREFIXES["job_fit"],
+                    ]
+                ),
+                [
+                    os.path.join(Config.KNOWLEDGE_BASE_PATH, "skills"),
+                    "data/monitored_folders/job_posts",
+                ],
+            )
+            cached = self.cache.get(cache_key)
+            if cached:
+                out.emit(f"\n🤖 Coach Analysis (cached):\n{cached}")
+                out.emit("=" * 60)
+                out.flush()
+                return
+
+        # Get job requirements and your skills in one batched search,
+        # loading the model in parallel
+        self._warm_up_llm()
+        job_context, skills_context = self.kb.search_batch(
+            [job_query, skills_query], [1, 2]
+        )
 
         # Combined context
         full_context = (
             f"JOB REQUIREMENTS:\n{job_context}\n\nMY CURRENT SKILLS:\n{skills_context}"
         )
 
-        # Ask LLM for analysis
-        prompt = """Analyze this job posting against my skills:
-
-1. What skills do I already have that match? (be specific)
-2. What are my top 3 skill gaps?
-3. What's my estimated readiness? (0-100%)
-4. What should I learn THIS WEEK to improve fit?
-
-Be direct and actionable."""
+        # Ask LLM for analysis (fixed instructions come from a cached prefix)
+        response = self.llm.chat(
+            prompt,
+            context=full_context,
+            system_prefix_id="job_fit",
+        )
 
-        response = self.llm.chat(prompt, context=full_context)
+        if cache_key and self._cacheable(response):
+            self.cache.set(cache_key, response, ttl_days=30)
 
-        print(f"\n🤖 Coach Analysis:\n{response}")
-        print("=" * 60)
+        out.emit(f"\n🤖 Coach Analysis:\n{response}")
+        out.emit("=" * 60)
+        out.flush()
 
     def build_knowledge_graph(self, vault_path="data/obsidian_vault"):
         """Build knowledge graph from Obsidian vault"""
@@ -267,39 +393,41 @@ Be direct and actionable."""
 
     def show_learning_path(self, from_skill: str, to_goal: str):
         """Show how a skill connects to a goal"""
+        self.kb.begin_turn()
         if not self.knowledge_graph:
             print("⚠️ Build knowledge graph first!")
             return
 
-        print(f"\n🎯 LEARNING PATH ANALYSIS")
-        print("=" * 60)
-        print(f"From: {from_skill}")
-        print(f"To:   {to_goal}")
+        out = _Out()
+
+        out.emit(f"\n🎯 LEARNING PATH ANALYSIS")
+        out.emit("=" * 60)
+        out.emit(f"From: {from_skill}")
+        out.emit(f"To:   {to_goal}")
 
         path = self.knowledge_graph.find_path(from_skill, to_goal)
 
         if path:
-            print(f"\n✅ Path found ({len(path) - 1} steps):\n")
+            out.emit(f"\n✅ Path found ({len(path) - 1} steps):\n")
             for i, node in enumerate(path):
                 indent = "   " * i
                 arrow = "→" if i < len(path) - 1 else "★"
-                node_type = self.knowledge_graph.nodes.get(node, {}).get(
-                    "type", "unknown"
-                )
-                print(f"{indent}{arrow} {node} ({node_type})")
+                node_type = self.knowledge_graph.node_type(node)
+                out.emit(f"{indent}{arrow} {node} ({node_type})")
 
             # Get LLM insight
             path_str = " → ".join(path)
             prompt = f"I want to go from {from_skill} to {to_goal}. The connection path is: {path_str}. Give me 3 actionable steps (brief)."
 
             insight = self.llm.chat(prompt, context="")
-            print(f"\n🤖 Coach Recommendation:")
-            print(f"   {insight}")
+            out.emit(f"\n🤖 Coach Recommendation:")
+            out.emit(f"   {insight}")
         else:
-            print("\n❌ No direct path found")
-            print("   Try creating a note that links these concepts!")
+            out.emit("\n❌ No direct path found")
+            out.emit("   Try creating a note that links these concepts!")
 
-        print("=" * 60)
+        out.emit("=" * 60)
+        out.flush()
 
     def explore_connections(self, node_name: str):
         """Explore all connections for a concept"""
@@ -311,18 +439,26 @@ Be direct and actionable."""
 
     def chat_with_cache(self, message: str, use_cache: bool = True):
         """Chat with caching support"""
-        self.user_profile["session_count"] += 1
+        self.kb.begin_turn()
+        use_cache = use_cache and self.cache is not None
 
         print(f"\n💬 You: {message}")
 
-        # Try cache first
+        # Try cache first: exact match needs no embedding; the query is only
+        # embedded for the semantic lookup if that misses
         if use_cache:
-            cached_response = self.cache.get(message)
+            cached_response = self.cache.get(
+                message, embedding=lambda: self.kb.embed([message])[0]
+            )
             if cached_response:
                 print(f"🤖 Coach (cached): {cached_response}")
                 return cached_response
 
-        # Cache miss - generate new response
+        # Cache miss - only real LLM calls count as conversations
+        self.user_profile["session_count"] += 1
+
+        # Generate new response (model loads during search)
+        self._warm_up_llm()
         relevant_context = self.kb.search(message, n_results=2)
         response = self.llm.chat(message, context=relevant_context)
 
@@ -333,6 +469,7 @@ Be direct and actionable."""
                 response,
                 ttl_days=7,
                 metadata={"context_used": len(relevant_context)},
+                embedding=self.kb.embed([message])[0],  # Memoized for this turn
             )
 
         print(f"🤖 Coach: {response}")
@@ -340,18 +477,20 @@ Be direct and actionable."""
 
     def show_cache_stats(self):
         """Display cache performance"""
-        print("\n💾 CACHE PERFORMANCE")
-        print("=" * 60)
-        self.cache.print_stats()
+        out = _Out()
+        out.emit("\n💾 CACHE PERFORMANCE")
+        out.emit("=" * 60)
+        out.lines.extend(self.cache.format_stats())
 
         stats = self.cache.get_stats()
 
         if stats["total_requests"] > 0:
             savings = stats["hits"] * 0.01  # Assume $0.01 per API call
-            print(f"\n💰 Estimated savings: ${savings:.2f}")
-            print(f"   (Based on {stats['hits']} cache hits @ $0.01 each)")
+            out.emit(f"\n💰 Estimated savings: ${savings:.2f}")
+            out.emit(f"   (Based on {stats['hits']} cache hits @ $0.01 each)")
 
-        print("=" * 60)
+        out.emit("=" * 60)
+        out.flush()
 
 
 def main():
@@ -428,6 +567,8 @@ def main():
     print("💎 Premium course: 6 days away!")
     print("=" * 70)
 
+    coach.stop_monitoring()
+
 
 if __name__ == "__main__":
     main()
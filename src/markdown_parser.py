@@ -5,15 +5,84 @@ Week 2 Day 8 - YAML frontmatter + Obsidian support
 
 import frontmatter
 import os
+from dataclasses import dataclass
+from functools import lru_cache
+import re
+from itertools import chain
 from typing import Dict, List, Optional
 
+# Compiled once; parse_file runs on every watched note change
+_WIKILINK_RE = re.compile(r"\[\[([^\]]+)\]\]")
+_INLINE_TAG_RE = re.compile(r"#(\w+)")
+
+# Note type by vault folder, then by tag; each table in priority order
+_FOLDER_TYPES = {
+    "daily": "daily_note",
+    "research": "research",
+    "skills": "skill_note",
+    "goals": "goal",
+    "projects": "project",
+}
+_TAG_TYPES = {"daily": "daily_note", "research": "research", "skill": "skill_note"}
+
+
+def _join(value) -> str:
+    """Frontmatter list-or-scalar as a flat string"""
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    return "" if value is None else str(value)
+
+
+@dataclass(slots=True)
+class NoteMeta:
+    """Typed view of the frontmatter fields the vault handlers use"""
+
+    date: str = ""
+    topic: str = ""
+    source: str = ""
+    category: str = ""
+    proficiency: int = 0
+    last_practiced: str = ""
+
+    @classmethod
+    def from_metadata(cls, metadata: Dict) -> "NoteMeta":
+        """Normalize raw frontmatter once (lists joined, proficiency int)"""
+        try:
+            proficiency = int(metadata.get("proficiency") or 0)
+        except (TypeError, ValueError):
+            proficiency = 0
+
+        return cls(
+            date=_join(metadata.get("date")),
+            topic=_join(metadata.get("topic")),
+            source=_join(metadata.get("source")),
+            category=_join(metadata.get("category")),
+            proficiency=proficiency,
+            last_practiced=_join(metadata.get("last-practiced")),
+        )
+
 
 class MarkdownParser:
     def __init__(self):
         print("📄 Markdown Parser initialized")
 
     def parse_file(self, filepath: str) -> Optional[Dict]:
-        """Parse markdown file with frontmatter"""
+        """Parse markdown file with frontmatter
+
+        Results are cached per (path, mtime, size), so repeated events for
+        an unchanged file skip the read and YAML parse. Treat as read-only.
+        """
+        try:
+            stat = os.stat(filepath)
+        except OSError as e:
+            print(f"⚠️ Parse error for {filepath}: {e}")
+            return None
+
+        return self._parse_file_cached(filepath, stat.st_mtime_ns, stat.st_size)
+
+    @lru_cache(maxsize=512)
+    def _parse_file_cached(self, filepath: str, mtime_ns: int, size: int):
+        """Parse a specific version of a file (mtime_ns/size key the cache)"""
         try:
             with open(filepath, "r", encoding="utf-8") as f:
                 post = frontmatter.load(f)
@@ -33,6 +102,7 @@ class MarkdownParser:
                 "filename": filename,
                 "filepath": filepath,
                 "metadata": metadata,
+                "meta": NoteMeta.from_metadata(metadata),
                 "content": content,
                 "wikilinks": wikilinks,
                 "tags": tags,
@@ -46,31 +116,19 @@ class MarkdownParser:
 
     def _extract_wikilinks(self, content: str) -> List[str]:
         """Extract [[wikilinks]] from content"""
-        import re
-
-        pattern = r"\[\[([^\]]+)\]\]"
-        links = re.findall(pattern, content)
-        return links
+        return _WIKILINK_RE.findall(content)
 
     def _extract_tags(self, metadata: Dict, content: str) -> List[str]:
         """Extract tags from frontmatter and inline #tags"""
-        tags = []
-
         # From frontmatter
-        if "tags" in metadata:
-            fm_tags = metadata["tags"]
-            if isinstance(fm_tags, list):
-                tags.extend(fm_tags)
-            elif isinstance(fm_tags, str):
-                tags.append(fm_tags)
+        fm_tags = metadata.get("tags", [])
+        if isinstance(fm_tags, str):
+            fm_tags = [fm_tags]
+        elif not isinstance(fm_tags, list):
+            fm_tags = []
 
-        # From inline #tags
-        import re
-
-        inline_tags = re.findall(r"#(\w+)", content)
-        tags.extend(inline_tags)
-
-        return list(set(tags))  # Remove duplicates
+        # Plus inline #tags; dict.fromkeys dedupes and keeps first-seen order
+        return list(dict.fromkeys(chain(fm_tags, _INLINE_TAG_RE.findall(content))))
 
     def extract_skills(self, parsed_data: Dict) -> List[str]:
         """Extract skills from metadata or content"""
@@ -95,7 +153,7 @@ class MarkdownParser:
         ]
         skills.extend(skill_tags)
 
-        return list(set(skills))
+        return list(dict.fromkeys(skills))
 
     def classify_note_type(self, parsed_data: Dict) -> str:
         """Classify note based on frontmatter and tags"""
@@ -103,25 +161,15 @@ class MarkdownParser:
         tags = parsed_data.get("tags", [])
         filepath = parsed_data.get("filepath", "")
 
-        # By folder
-        if "/daily/" in filepath:
-            return "daily_note"
-        elif "/research/" in filepath:
-            return "research"
-        elif "/skills/" in filepath:
-            return "skill_note"
-        elif "/goals/" in filepath:
-            return "goal"
-        elif "/projects/" in filepath:
-            return "project"
-
-        # By tags
-        if "daily" in tags:
-            return "daily_note"
-        elif "research" in tags:
-            return "research"
-        elif "skill" in tags:
-            return "skill_note"
+        # By folder, then by tag: tables are walked in priority order
+        folders = set(filepath.replace("\\", "/").split("/")[:-1])
+        for folder, note_type in _FOLDER_TYPES.items():
+            if folder in folders:
+                return note_type
+
+        for tag, note_type in _TAG_TYPES.items():
+            if tag in tags:
+                return note_type
 
         return "general"
 
@@ -3,52 +3,227 @@ Obsidian-specific event handlers
 Week 2 Day 8 - Different logic per folder
 """
 
+from abc import ABC, abstractmethod
 from os.path import join
 from watchdog.events import FileSystemEventHandler
 from markdown_parser import MarkdownParser
 from rag_engine import KnowledgeBase
 import os
+import queue
+import threading
 import time
+from typing import Optional
 
 
-class ObsidianDailyNoteHandler(FileSystemEventHandler):
+# Hidden files and editor swap/backup files never reach the parser
+_IGNORED_PREFIXES = (".",)
+_IGNORED_SUFFIXES = (".swp", ".tmp", "~")
+
+# One parser (and its parse cache) shared by all handlers
+_PARSER = MarkdownParser()
+
+
+class UpsertBatcher:
+    """Coalesces note upserts into batched knowledge base writes
+
+    Shared by the vault handlers; flushes when batch_size notes are
+    pending, after idle_seconds without new notes, or on flush().
+    Writes go through KnowledgeBase.add_changed_documents, so notes that
+    are unchanged since a previous run are not re-embedded either.
+    """
+
+    def __init__(
+        self, kb: KnowledgeBase, batch_size: int = 32, idle_seconds: float = 0.5
+    ):
+        self.kb = kb
+        self.batch_size = batch_size
+        self.idle_seconds = idle_seconds
+        self._pending = {}  # doc_id -> (document, metadata, content hash)
+        self._indexed = {}  # doc_id -> digest of the last upserted version
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def add(self, doc_id: str, document: str, metadata: dict) -> bool:
+        """Queue a note for the next batch
+
+        Returns False (nothing queued) when the note matches the version
+        already in the knowledge base, e.g. an editor auto-save.
+        """
+        digest = KnowledgeBase.content_hash(document, metadata)
+
+        with self._lock:
+            if self._indexed.get(doc_id) == digest:
+                # Reverted to the indexed version: drop any queued edit
+                self._pending.pop(doc_id, None)
+                return False
+
+            self._pending[doc_id] = (document, metadata, digest)
+            full = len(self._pending) >= self.batch_size
+
+            if self._timer:
+                self._timer.cancel()
+            self._timer = None
+            if not full:
+                self._timer = threading.Timer(self.idle_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if full:
+            self.flush()
+        return True
+
+    def flush(self) -> int:
+        """Upsert all pending notes (one embedding pass per batch)"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, {}
+
+        if not pending:
+            return 0
+
+        # The knowledge base skips notes whose stored content_hash matches
+        ids = list(pending)
+        written = self.kb.add_changed_documents(
+            ids,
+            [pending[doc_id][0] for doc_id in ids],
+            [pending[doc_id][1] for doc_id in ids],
+            batch_size=self.batch_size,
+        )
+
+        with self._lock:
+            for doc_id in ids:
+                self._indexed[doc_id] = pending[doc_id][2]
+
+        if written:
+            print(f"   💾 Indexed {written} note(s)")
+        return written
+
+
+class QueuedNoteHandler(FileSystemEventHandler, ABC):
+    """Base handler: debounces note events and processes them off-thread
+
+    Editors emit several modify events per save. Events only mark a note
+    as dirty; one background consumer shared by all handlers processes it
+    once it has been quiet for debounce_seconds and its size has stopped
+    changing, so the watchdog dispatch thread never blocks.
+    """
+
+    # Shared by every handler: notes are parsed one at a time, in order
+    _last_seen: dict[str, float] = {}
+    _lock = threading.Lock()
+    _queue = queue.Queue()
+    _worker = None
+
+    def __init__(self, debounce_seconds: float = 1.0):
+        super().__init__()
+        self._debounce_s = debounce_seconds
+
+        cls = QueuedNoteHandler
+        with cls._lock:
+            if cls._worker is None:
+                cls._worker = threading.Thread(target=cls._consume, daemon=True)
+                cls._worker.start()
+
+    def _note_name(self, event) -> Optional[str]:
+        """Basename of a real markdown note, None for dirs and editor junk"""
+        if event.is_directory:
+            return None
+
+        name = os.path.basename(event.src_path)
+        if (
+            not name.endswith(".md")
+            or name.startswith(_IGNORED_PREFIXES)
+            or name.endswith(_IGNORED_SUFFIXES)
+        ):
+            return None
+        return name
+
+    def _enqueue(self, filepath: str) -> bool:
+        """Mark note dirty; True if this starts a new burst"""
+        with self._lock:
+            new_burst = filepath not in self._last_seen
+            self._last_seen[filepath] = time.monotonic()
+        if new_burst:
+            self._queue.put((self, filepath))
+        return new_burst
+
+    @staticmethod
+    def _size_stable(filepath: str, interval: float = 0.1) -> bool:
+        """True unless the file is still growing (write in progress)"""
+        try:
+            before = os.stat(filepath).st_size
+            time.sleep(interval)
+            return os.stat(filepath).st_size == before
+        except FileNotFoundError:
+            return True  # Deleted meanwhile; _process_note reports it
+
+    @classmethod
+    def _consume(cls):
+        """Worker: process each note once its events have settled"""
+        while True:
+            handler, filepath = cls._queue.get()
+            debounce_s = handler._debounce_s
+            while True:
+                with cls._lock:
+                    quiet = time.monotonic() - cls._last_seen[filepath]
+                if quiet < debounce_s:
+                    time.sleep(debounce_s - quiet)
+                    continue
+                if not cls._size_stable(filepath):
+                    with cls._lock:
+                        cls._last_seen[filepath] = time.monotonic()
+                    continue
+                with cls._lock:
+                    # A late event may have landed during the size check
+                    if time.monotonic() - cls._last_seen[filepath] >= debounce_s:
+                        del cls._last_seen[filepath]
+                        break
+
+            try:
+                handler._process_note(filepath)
+            except Exception as e:
+                print(f"   ⚠️ Could not process {os.path.basename(filepath)}: {e}")
+
+    @abstractmethod
+    def _process_note(self, filepath: str):
+        """Parse one settled note and queue it for indexing"""
+
+
+class ObsidianDailyNoteHandler(QueuedNoteHandler):
     """Handler for daily notes - tracks learning progress"""
 
-    def __init__(self, kb: KnowledgeBase):
-        super().__init__()  # For symlinked folders
+    def __init__(self, kb: KnowledgeBase, batcher: UpsertBatcher = None):
+        super().__init__()
         self.kb = kb
-        self.parser = MarkdownParser()
+        self.batcher = batcher or UpsertBatcher(kb)
+        self.parser = _PARSER
         print("📅 Daily Note Handler initialized")
 
     def on_created(self, event):
-        if event.is_directory or not event.src_path.endswith(".md"):
-            return
-
-        print(f"\n📅 NEW DAILY NOTE: {os.path.basename(event.src_path)}")
-        self._process_daily_note(event.src_path)
+        name = self._note_name(event)
+        if name and self._enqueue(event.src_path):
+            print(f"\n📅 NEW DAILY NOTE: {name}")
 
     def on_modified(self, event):
-        if event.is_directory or not event.src_path.endswith(".md"):
-            return
-
-        print(f"\n✏️  DAILY NOTE UPDATED: {os.path.basename(event.src_path)}")
-        self._process_daily_note(event.src_path)
+        name = self._note_name(event)
+        if name and self._enqueue(event.src_path):
+            print(f"\n✏️  DAILY NOTE UPDATED: {name}")
 
-    def _process_daily_note(self, filepath: str):
+    def _process_note(self, filepath: str):
         """Process daily note and extract learning"""
-        time.sleep(0.5)  # Wait for file write
-
         parsed = self.parser.parse_file(filepath)
         if not parsed:
             return
 
         # Extract key information
         skills_learned = self.parser.extract_skills(parsed)
-        metadata = parsed.get("metadata", {})
+        meta = parsed["meta"]
 
         # Build summary
         summary = f"Daily Note: {parsed['filename']}\n"
-        summary += f"Date: {metadata.get('date', 'unknown')}\n"
+        summary += f"Date: {meta.date or 'unknown'}\n"
 
         if skills_learned:
             summary += f"Skills practiced: {', '.join(skills_learned)}\n"
@@ -58,89 +233,88 @@ class ObsidianDailyNoteHandler(FileSystemEventHandler):
         # Add to knowledge base
         doc_id = f"daily_{parsed['filename'].replace('.md', '')}"
 
-        self.kb.collection.upsert(
-            documents=[summary],
-            ids=[doc_id],
-            metadatas=[
-                {
-                    "source": parsed["filename"],
-                    "type": "daily_note",
-                    "date": str(metadata.get("date", "")),
-                    "skills": ", ".join(skills_learned) if skills_learned else "",
-                    "tags": ", ".join(parsed["tags"]) if parsed["tags"] else "",
-                }
-            ],
-        )
+        metadata = {
+            "source": parsed["filename"],
+            "type": "daily_note",
+            "date": meta.date,
+            "tags": ", ".join(parsed["tags"]) if parsed["tags"] else "",
+        }
+        # Stored as a list so readers can count skills without parsing;
+        # Chroma rejects empty lists, so the key is omitted when there are none
+        if skills_learned:
+            metadata["skills"] = [str(skill) for skill in skills_learned]
+
+        queued = self.batcher.add(doc_id, summary, metadata)
+        if not queued:
+            print("   ⏭️  No changes since last index, skipped")
+            return
 
         print(f"   ✓ Tracked learning: {len(skills_learned)} skills")
         if skills_learned:
             print(f"      Skills: {', '.join(skills_learned)}")
 
 
-class ObsidianResearchHandler(FileSystemEventHandler):
+class ObsidianResearchHandler(QueuedNoteHandler):
     """Handler for research notes - market intelligence"""
 
-    def __init__(self, kb: KnowledgeBase):
+    def __init__(self, kb: KnowledgeBase, batcher: UpsertBatcher = None):
+        super().__init__()
         self.kb = kb
-        self.parser = MarkdownParser()
+        self.batcher = batcher or UpsertBatcher(kb)
+        self.parser = _PARSER
         print("🔍 Research Handler initialized")
 
     def on_created(self, event):
-        if event.is_directory or not event.src_path.endswith(".md"):
-            return
-
-        print(f"\n🔍 NEW RESEARCH: {os.path.basename(event.src_path)}")
-        self._process_research(event.src_path)
+        name = self._note_name(event)
+        if name and self._enqueue(event.src_path):
+            print(f"\n🔍 NEW RESEARCH: {name}")
 
     def on_modified(self, event):
-        if event.is_directory or not event.src_path.endswith(".md"):
-            return
-
-        print(f"\n✏️  RESEARCH UPDATED: {os.path.basename(event.src_path)}")
-        self._process_research(event.src_path)
+        name = self._note_name(event)
+        if name and self._enqueue(event.src_path):
+            print(f"\n✏️  RESEARCH UPDATED: {name}")
 
-    def _process_research(self, filepath: str):
+    def _process_note(self, filepath: str):
         """Process research note"""
-        time.sleep(0.5)
-
         parsed = self.parser.parse_file(filepath)
         if not parsed:
             return
 
-        metadata = parsed.get("metadata", {})
+        meta = parsed["meta"]
 
         # Add context
         enhanced_content = f"Research: {parsed['filename']}\n"
-        enhanced_content += f"Topic: {metadata.get('topic', 'general')}\n"
-        enhanced_content += f"Source: {metadata.get('source', 'unknown')}\n\n"
+        enhanced_content += f"Topic: {meta.topic or 'general'}\n"
+        enhanced_content += f"Source: {meta.source or 'unknown'}\n\n"
         enhanced_content += parsed["content"]
 
         doc_id = f"research_{parsed['filename'].replace('.md', '').replace(' ', '_')}"
 
-        self.kb.collection.upsert(
-            documents=[enhanced_content],
-            ids=[doc_id],
-            metadatas=[
-                {
-                    "source": parsed["filename"],
-                    "type": "research",
-                    "topic": ", ".join(metadata.get("topic", []))
-                    if isinstance(metadata.get("topic"), list)
-                    else str(metadata.get("topic", "")),
-                    "tags": ", ".join(parsed["tags"]) if parsed["tags"] else "",
-                }
-            ],
+        queued = self.batcher.add(
+            doc_id,
+            enhanced_content,
+            {
+                "source": parsed["filename"],
+                "type": "research",
+                "topic": meta.topic,
+                "tags": ", ".join(parsed["tags"]) if parsed["tags"] else "",
+            },
         )
+        if not queued:
+            print("   ⏭️  No changes since last index, skipped")
+            return
 
         print(f"   ✓ Indexed as market intelligence")
 
 
-class ObsidianSkillHandler(FileSystemEventHandler):
+class ObsidianSkillHandler(QueuedNoteHandler):
     """Handler for skill notes - proficiency tracking"""
 
-    def __init__(self, kb: KnowledgeBase):
+    def __init__(self, kb: KnowledgeBase, batcher: UpsertBatcher = None):
+        super().__init__()
         self.kb = kb
-        self.parser = MarkdownParser()
+        self.batcher = batcher or UpsertBatcher(kb)
+        self.parser = _PARSER
         print("🎯 Skill Handler initialized")
 
         from skills_tracker import SkillsTracker
@@ -150,62 +324,54 @@ class ObsidianSkillHandler(FileSystemEventHandler):
         print("🎯 Skill Handler initialized")
 
     def on_created(self, event):
-        if event.is_directory or not event.src_path.endswith(".md"):
-            return
-
-        print(f"\n🎯 NEW SKILL NOTE: {os.path.basename(event.src_path)}")
-        self._process_skill(event.src_path)
+        name = self._note_name(event)
+        if name and self._enqueue(event.src_path):
+            print(f"\n🎯 NEW SKILL NOTE: {name}")
 
     def on_modified(self, event):
-        if event.is_directory or not event.src_path.endswith(".md"):
-            return
+        name = self._note_name(event)
+        if name and self._enqueue(event.src_path):
+            print(f"\n✏️  SKILL UPDATED: {name}")
 
-        print(f"\n✏️  SKILL UPDATED: {os.path.basename(event.src_path)}")
-        self._process_skill(event.src_path)
-
-    def _process_skill(self, filepath: str):
+    def _process_note(self, filepath: str):
         """Process skill note with proficiency tracking"""
-        time.sleep(0.5)
-
         parsed = self.parser.parse_file(filepath)
         if not parsed:
             return
 
-        metadata = parsed.get("metadata", {})
-        proficiency = metadata.get("proficiency", 0)
+        meta = parsed["meta"]
+        proficiency = meta.proficiency
 
         # Enhanced content with proficiency context
         enhanced = f"Skill: {parsed['filename']}\n"
         enhanced += f"Proficiency: {proficiency}/10\n"
-        enhanced += f"Category: {metadata.get('category', 'general')}\n"
-        enhanced += f"Last practiced: {metadata.get('last-practiced', 'unknown')}\n\n"
+        enhanced += f"Category: {meta.category or 'general'}\n"
+        enhanced += f"Last practiced: {meta.last_practiced or 'unknown'}\n\n"
         enhanced += parsed["content"]
 
         doc_id = f"skill_{parsed['filename'].replace('.md', '')}"
 
-        self.kb.collection.upsert(
-            documents=[enhanced],
-            ids=[doc_id],
-            metadatas=[
-                {
-                    "source": parsed["filename"],
-                    "type": "skill_note",
-                    "proficiency": int(proficiency) if proficiency else 0,
-                    "category": ", ".join(metadata.get("category", []))
-                    if isinstance(metadata.get("category"), list)
-                    else str(metadata.get("category", ""))
-                    if isinstance(metadata.get("category"), list)
-                    else str(metadata.get("category", "")),
-                    "tags": ", ".join(parsed["tags"]) if parsed["tags"] else "",
-                }
-            ],
+        queued = self.batcher.add(
+            doc_id,
+            enhanced,
+            {
+                "source": parsed["filename"],
+                "type": "skill_note",
+                "proficiency": proficiency,
+                "category": meta.category,
+                "tags": ", ".join(parsed["tags"]) if parsed["tags"] else "",
+            },
         )
+        if not queued:
+            print("   ⏭️  No changes since last index, skipped")
+            return
 
         print(f"   ✓ Skill tracked: {proficiency}/10 proficiency")
 
         # New: Auto-track proficiency history
-        skill_name = parsed["filename"].replace(".md", "")
-        self.tracker.update_skill_history(skill_name, proficiency)
+        skill_name = parsed["filename"].removesuffix(".md")
+        with self.tracker.batch():
+            self.tracker.update_skill_history(skill_name, proficiency)
 
         # Show progress if available
         progress = self.tracker.get_skill_progress(skill_name)
@@ -4,29 +4,65 @@ Week 2 Day 8
 """
 
 import os
-import time
+import signal
+import threading
+from watchdog.events import (
+    EVENT_TYPE_MOVED,
+    DirCreatedEvent,
+    FileCreatedEvent,
+    FileSystemEventHandler,
+)
 from watchdog.observers import Observer
 from rag_engine import KnowledgeBase
 from obsidian_handlers import (
     ObsidianDailyNoteHandler,
     ObsidianResearchHandler,
     ObsidianSkillHandler,
+    UpsertBatcher,
 )
 
 
+class DispatchingHandler(FileSystemEventHandler):
+    """Route events from one recursive watch to the per-folder handler"""
+
+    def __init__(self, root: str, routes: dict):
+        super().__init__()
+        self.root = root  # Real vault path the recursive watch is on
+        self.routes = routes  # real folder path -> handler
+
+    def on_any_event(self, event):
+        # A move lands the note in its destination folder: route it there,
+        # as a new note (the handlers only react to creates and modifies)
+        if event.event_type == EVENT_TYPE_MOVED:
+            created = DirCreatedEvent if event.is_directory else FileCreatedEvent
+            event = created(event.dest_path)
+
+        # .obsidian/, .git/ and other dot-directories never hold notes
+        relative = os.path.relpath(event.src_path, self.root)
+        if any(part.startswith(".") for part in relative.split(os.sep)[:-1]):
+            return
+
+        # Folders were watched non-recursively: only direct children count
+        handler = self.routes.get(os.path.dirname(event.src_path))
+        if handler is not None:
+            handler.dispatch(event)
+
+
 class ObsidianVaultWatcher:
     """Watch Obsidian vault with specialized handlers per folder"""
 
-    def __init__(self, vault_path: str):
+    def __init__(self, vault_path: str, kb: KnowledgeBase | None = None):
         self.vault_path = vault_path
-        self.kb = KnowledgeBase()
+        # Reuse the caller's knowledge base instead of opening a second client
+        self.kb = kb or KnowledgeBase()
         self.observer = Observer()
 
-        # Create specialized handlers
+        # Create specialized handlers, sharing one batched upsert queue
+        self.batcher = UpsertBatcher(self.kb)
         self.handlers = {
-            "daily": ObsidianDailyNoteHandler(self.kb),
-            "research": ObsidianResearchHandler(self.kb),
-            "skills": ObsidianSkillHandler(self.kb),
+            "daily": ObsidianDailyNoteHandler(self.kb, self.batcher),
+            "research": ObsidianResearchHandler(self.kb, self.batcher),
+            "skills": ObsidianSkillHandler(self.kb, self.batcher),
         }
 
         print(f"🗂️  Obsidian Vault Watcher initialized")
@@ -35,6 +71,8 @@ class ObsidianVaultWatcher:
     def start(self):
         """Start watching vault folders"""
         folders_watched = 0
+        vault_root = os.path.realpath(self.vault_path)
+        routes = {}
 
         for folder_name, handler in self.handlers.items():
             folder_path = os.path.join(self.vault_path, folder_name)
@@ -42,17 +80,28 @@ class ObsidianVaultWatcher:
             # Resolve symlink to real path
             real_path = os.path.realpath(folder_path)
 
-            if os.path.exists(real_path):
-                self.observer.schedule(handler, real_path, recursive=False)
-                print(f"   👁️  Watching: {folder_name}/ -> {real_path}")
-                folders_watched += 1
-            else:
+            if not os.path.exists(real_path):
                 print(f"   ⚠️ Folder not found: {folder_name}/ (create it!)")
+                continue
+
+            if os.path.commonpath([vault_root, real_path]) == vault_root:
+                # Covered by the single recursive watch on the vault root
+                routes[real_path] = handler
+            else:
+                # Symlinked outside the vault: needs its own watch
+                self.observer.schedule(handler, real_path, recursive=False)
+            print(f"   👁️  Watching: {folder_name}/ -> {real_path}")
+            folders_watched += 1
 
         if folders_watched == 0:
             print("\n⚠️ No folders found! Check vault path.")
             return False
 
+        if routes:
+            self.observer.schedule(
+                DispatchingHandler(vault_root, routes), vault_root, recursive=True
+            )
+
         self.observer.start()
         print(f"\n✅ Watching {folders_watched} folder(s)")
         print("   Write Obsidian notes to see real-time tracking...")
@@ -63,6 +112,8 @@ class ObsidianVaultWatcher:
         """Stop watching"""
         self.observer.stop()
         self.observer.join()
+        self.batcher.flush()
+        self.handlers["skills"].tracker.flush()
         print("\n🛑 Obsidian Watcher stopped")
 
 
@@ -78,9 +129,10 @@ if __name__ == "__main__":
 
     watcher = ObsidianVaultWatcher(VAULT_PATH)
 
+    # Block until Ctrl+C instead of polling with sleep
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+
     if watcher.start():
-        try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            watcher.stop()
+        stop_event.wait()
+        watcher.stop()
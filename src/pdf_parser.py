@@ -3,9 +3,14 @@ PDF Parser for Research Papers and Documents
 Week 3 Day 16 - Extract text and metadata from PDFs
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
 from typing import Dict, Optional, List
 from pathlib import Path
+import mmap
+import os
 import re
+from text_utils import count_words
 
 try:
     import PyPDF2
@@ -16,22 +21,53 @@ except ImportError:
     PDF_AVAILABLE = False
     print("⚠️  PDF libraries not installed. Run: pip install PyPDF2 pdfplumber")
 
+# Filename stem -> default title: dashes and underscores become spaces
+_TITLE_TABLE = str.maketrans({"-": " ", "_": " "})
+
+# parse_file modes: full text, metadata + page count, or page count only
+_PARSE_MODES = ("full", "metadata", "pages")
+
+# Less PyPDF2 text than this (stripped) means fall back to pdfplumber
+_MIN_TEXT_CHARS = 50
+
+# pdfplumber pages opened at once; bounds its object caches on long PDFs
+_PLUMBER_WINDOW = 50
+
+# Below this many pages per worker, splitting a PDF costs more than it saves
+_MIN_PAGES_PER_WORKER = 8
+
 
 class PDFParser:
     """Extract text and metadata from PDF files"""
 
-    def __init__(self):
+    def __init__(
+        self, quiet: bool = False, page_workers: int = min(os.cpu_count() or 1, 4)
+    ):
+        self.quiet = quiet  # Silences progress output (worker processes)
+        self.page_workers = page_workers  # Processes for slow page layout
         self.stats = {
             "files_processed": 0,
             "pages_extracted": 0,
             "extraction_method": "hybrid",  # PyPDF2 + pdfplumber
         }
 
-        print(f"📄 PDF Parser initialized")
-        print(f"   Available: {PDF_AVAILABLE}")
+        self._log(f"📄 PDF Parser initialized")
+        self._log(f"   Available: {PDF_AVAILABLE}")
+
+    def _log(self, message: str):
+        """Progress output, unless quiet"""
+        if not self.quiet:
+            print(message)
+
+    def parse_file(self, filepath: str, mode: str = "full") -> Optional[Dict]:
+        """Parse a PDF file and extract content + metadata
+
+        mode="metadata" skips text extraction (content is empty) and
+        mode="pages" also skips the document info; both are much cheaper.
+        """
+        if mode not in _PARSE_MODES:
+            raise ValueError(f"mode must be one of {_PARSE_MODES}, got {mode!r}")
 
-    def parse_file(self, filepath: str) -> Optional[Dict]:
-        """Parse a PDF file and extract content + metadata"""
         if not PDF_AVAILABLE:
             print("❌ PDF libraries not available")
             return None
@@ -46,24 +82,38 @@ class PDFParser:
             print(f"❌ Not a PDF file: {filepath}")
             return None
 
-        print(f"\n📄 Parsing PDF: {filepath.name}")
-
-        # Try PyPDF2 first (faster, works for most PDFs)
-        content = self._extract_with_pypdf2(filepath)
-
-        # If PyPDF2 fails or returns empty, try pdfplumber
-        if not content or len(content.strip()) < 50:
-            print("   ℹ️  PyPDF2 returned minimal text, trying pdfplumber...")
+        self._log(f"\n📄 Parsing PDF: {filepath.name}")
+
+        # One PyPDF2 reader for text, metadata and page count. It reads a
+        # memory map, so only the parts of the file it touches are paged in
+        with open(filepath, "rb") as file, self._map(file) as stream:
+            try:
+                reader = PyPDF2.PdfReader(stream)
+            except Exception as e:
+                print(f"   ⚠️  PyPDF2 failed: {e}")
+                reader = None
+
+            # Try PyPDF2 first (faster, works for most PDFs)
+            if mode == "full" and reader:
+                content = self._extract_with_pypdf2(reader)
+            else:
+                content = ""
+
+            # Extract metadata
+            metadata = self._extract_metadata(
+                reader if mode != "pages" else None, filepath
+            )
+
+            # Get page count
+            page_count = self._get_page_count(reader)
+
+        # If PyPDF2 fails or returns too little text, try pdfplumber
+        if mode == "full" and not content:
+            self._log("   ℹ️  PyPDF2 returned minimal text, trying pdfplumber...")
             content = self._extract_with_pdfplumber(filepath)
 
-        # Extract metadata
-        metadata = self._extract_metadata(filepath)
-
-        # Get page count
-        page_count = self._get_page_count(filepath)
-
         # Word count
-        word_count = len(content.split())
+        word_count = count_words(content)
 
         result = {
             "filename": filepath.name,
@@ -75,30 +125,43 @@ class PDFParser:
             "file_type": "pdf",
         }
 
-        print(f"   ✓ Extracted: {word_count} words from {page_count} pages")
+        if mode != "full":
+            self._log(f"   ✓ Read {mode}: {page_count} pages")
+            return result
+
+        self._log(f"   ✓ Extracted: {word_count} words from {page_count} pages")
 
         self.stats["files_processed"] += 1
         self.stats["pages_extracted"] += page_count
 
         return result
 
-    def _extract_with_pypdf2(self, filepath: Path) -> str:
-        """Extract text using PyPDF2 (fast, basic)"""
+    @staticmethod
+    def _map(file):
+        """Read-only memory map of an open file (the file itself if empty)"""
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return file  # Zero-length files cannot be mapped
+
+    def _extract_with_pypdf2(self, reader: "PyPDF2.PdfReader") -> str:
+        """Extract text using PyPDF2 (fast, basic); "" if too little text"""
         try:
             content_parts = []
+            text_chars = 0  # Stripped chars, counted only up to the minimum
 
-            with open(filepath, "rb") as file:
-                reader = PyPDF2.PdfReader(file)
+            for page in reader.pages:
+                text = page.extract_text()
+                if text:
+                    content_parts.append(text)
+                    if text_chars < _MIN_TEXT_CHARS:
+                        text_chars += len(text.strip())
 
-                for page in reader.pages:
-                    text = page.extract_text()
-                    if text:
-                        content_parts.append(text)
+            if text_chars < _MIN_TEXT_CHARS:
+                return ""
 
             content = "\n\n".join(content_parts)
-
-            if content and len(content.strip()) > 50:
-                print(f"   ✓ PyPDF2: {len(content)} chars")
+            self._log(f"   ✓ PyPDF2: {len(content)} chars")
 
             return content
 
@@ -109,28 +172,31 @@ class PDFParser:
     def _extract_with_pdfplumber(self, filepath: Path) -> str:
         """Extract text using pdfplumber (better layout preservation)"""
         try:
-            content_parts = []
-
             with pdfplumber.open(filepath) as pdf:
-                for page in pdf.pages:
-                    # Extract text with layout
-                    text = page.extract_text(layout=True)
-
-                    if text:
-                        content_parts.append(text)
-
-                    # Also try to extract tables
-                    tables = page.extract_tables()
-                    if tables:
-                        for table in tables:
-                            # Convert table to text
-                            table_text = self._table_to_text(table)
-                            content_parts.append(f"\n[TABLE]\n{table_text}\n")
+                page_count = len(pdf.pages)
+                workers = min(self.page_workers, page_count // _MIN_PAGES_PER_WORKER)
+                if workers <= 1 and page_count <= _PLUMBER_WINDOW:
+                    content_parts = _plumber_page_texts(pdf.pages)
+
+            if workers <= 1 and page_count > _PLUMBER_WINDOW:
+                content_parts = _plumber_range(str(filepath), 0, page_count)
+            elif workers > 1:
+                # pdfplumber objects are not shareable: each worker opens
+                # the file itself and lays out one contiguous page range
+                step = -(-page_count // workers)
+                starts = range(0, page_count, step)
+                stops = [min(start + step, page_count) for start in starts]
+                with ProcessPoolExecutor(max_workers=workers) as ex:
+                    content_parts = list(
+                        chain.from_iterable(
+                            ex.map(_plumber_range, repeat(str(filepath)), starts, stops)
+                        )
+                    )
 
             content = "\n\n".join(content_parts)
 
             if content:
-                print(f"   ✓ pdfplumber: {len(content)} chars")
+                self._log(f"   ✓ pdfplumber: {len(content)} chars")
 
             return content
 
@@ -138,68 +204,74 @@ class PDFParser:
             print(f"   ⚠️  pdfplumber failed: {e}")
             return ""
 
-    def _table_to_text(self, table: List[List]) -> str:
+    @staticmethod
+    def _table_to_text(table: List[List]) -> str:
         """Convert table data to readable text"""
         if not table:
             return ""
 
-        # Simple table formatting
-        rows = []
-        for row in table:
-            # Filter out None values
-            clean_row = [str(cell) if cell else "" for cell in row]
-            rows.append(" | ".join(clean_row))
-
-        return "\n".join(rows)
+        # Simple table formatting; None cells (merged/empty) become ""
+        return "\n".join(
+            " | ".join("" if cell is None else str(cell) for cell in row)
+            for row in table
+        )
 
-    def _extract_metadata(self, filepath: Path) -> Dict:
+    def _extract_metadata(
+        self, reader: Optional["PyPDF2.PdfReader"], filepath: Path
+    ) -> Dict:
         """Extract PDF metadata (title, author, etc.)"""
         metadata = {
             "filename": filepath.name,
             "source": "pdf",
-            "title": filepath.stem.replace("-", " ").replace("_", " ").title(),
+            "title": filepath.stem.translate(_TITLE_TABLE).title(),
         }
 
+        if reader is None:
+            return metadata
+
         try:
-            with open(filepath, "rb") as file:
-                reader = PyPDF2.PdfReader(file)
-
-                if reader.metadata:
-                    # Extract standard PDF metadata
-                    if reader.metadata.title:
-                        metadata["title"] = reader.metadata.title
-                    if reader.metadata.author:
-                        metadata["author"] = reader.metadata.author
-                    if reader.metadata.subject:
-                        metadata["subject"] = reader.metadata.subject
-                    if reader.metadata.creator:
-                        metadata["creator"] = reader.metadata.creator
-                    if reader.metadata.producer:
-                        metadata["producer"] = reader.metadata.producer
-
-                    # Creation date
-                    if (
-                        hasattr(reader.metadata, "creation_date")
-                        and reader.metadata.creation_date
-                    ):
-                        metadata["created"] = str(reader.metadata.creation_date)
+            if reader.metadata:
+                # Extract standard PDF metadata
+                if reader.metadata.title:
+                    metadata["title"] = reader.metadata.title
+                if reader.metadata.author:
+                    metadata["author"] = reader.metadata.author
+                if reader.metadata.subject:
+                    metadata["subject"] = reader.metadata.subject
+                if reader.metadata.creator:
+                    metadata["creator"] = reader.metadata.creator
+                if reader.metadata.producer:
+                    metadata["producer"] = reader.metadata.producer
+
+                # Creation date
+                if (
+                    hasattr(reader.metadata, "creation_date")
+                    and reader.metadata.creation_date
+                ):
+                    metadata["created"] = str(reader.metadata.creation_date)
 
         except Exception as e:
-            print(f"   ℹ️  Could not extract metadata: {e}")
+            self._log(f"   ℹ️  Could not extract metadata: {e}")
 
         return metadata
 
-    def _get_page_count(self, filepath: Path) -> int:
+    def _get_page_count(self, reader: Optional["PyPDF2.PdfReader"]) -> int:
         """Get number of pages in PDF"""
         try:
-            with open(filepath, "rb") as file:
-                reader = PyPDF2.PdfReader(file)
-                return len(reader.pages)
+            # /Count on the root page tree: no need to walk every page
+            return int(reader.trailer["/Root"]["/Pages"]["/Count"])
+        except Exception:
+            pass
+
+        try:
+            return len(reader.pages)
         except:
             return 0
 
-    def parse_folder(self, folder_path: str) -> List[Dict]:
-        """Parse all PDFs in a folder"""
+    def parse_folder(
+        self, folder_path: str, num_workers: int = min(os.cpu_count() or 1, 4)
+    ) -> List[Dict]:
+        """Parse all PDFs in a folder, one worker process per file"""
         folder = Path(folder_path)
 
         if not folder.exists():
@@ -214,11 +286,21 @@ class PDFParser:
 
         print(f"\n📂 Found {len(pdf_files)} PDF file(s)")
 
-        results = []
-        for pdf_file in pdf_files:
-            result = self.parse_file(pdf_file)
-            if result:
-                results.append(result)
+        if num_workers <= 1 or len(pdf_files) == 1:
+            return [r for r in map(self.parse_file, pdf_files) if r]
+
+        # Extraction is CPU-bound Python; parse files in separate processes
+        with ProcessPoolExecutor(max_workers=num_workers) as ex:
+            results = [r for r in ex.map(_parse_one, map(str, pdf_files)) if r]
+
+        # Workers count into their own parser; merge into this one
+        for result in results:
+            self._log(
+                f"   ✓ {result['filename']}: {result['word_count']} words "
+                f"from {result['page_count']} pages"
+            )
+            self.stats["files_processed"] += 1
+            self.stats["pages_extracted"] += result["page_count"]
 
         return results
 
@@ -243,6 +325,50 @@ class PDFParser:
         print(f"   Avg pages/file: {stats['avg_pages_per_file']:.1f}")
 
 
+def _plumber_page_texts(pages) -> List[str]:
+    """Layout text plus tables for a run of pdfplumber pages"""
+    content_parts = []
+    for page in pages:
+        # Extract text with layout
+        text = page.extract_text(layout=True)
+
+        if text:
+            content_parts.append(text)
+
+        # Also try to extract tables
+        tables = page.extract_tables()
+        if tables:
+            for table in tables:
+                # Convert table to text
+                table_text = PDFParser._table_to_text(table)
+                content_parts.append(f"\n[TABLE]\n{table_text}\n")
+
+        # Drop the page's parsed chars/objects before moving on
+        page.close()
+
+    return content_parts
+
+
+def _plumber_range(filepath: str, start: int, stop: int) -> List[str]:
+    """Extract pages [start, stop) of one PDF, _PLUMBER_WINDOW at a time
+
+    Also the worker entry point for page-parallel extraction.
+    """
+    content_parts = []
+    for window in range(start, stop, _PLUMBER_WINDOW):
+        # pdfplumber page numbers are 1-based
+        pages = list(range(window + 1, min(window + _PLUMBER_WINDOW, stop) + 1))
+        with pdfplumber.open(filepath, pages=pages) as pdf:
+            content_parts.extend(_plumber_page_texts(pdf.pages))
+    return content_parts
+
+
+def _parse_one(filepath: str) -> Optional[Dict]:
+    """Worker entry point for parse_folder (readers are not picklable)"""
+    # Already one process per file: don't split pages further
+    return PDFParser(quiet=True, page_workers=1).parse_file(filepath)
+
+
 # Quick test
 if __name__ == "__main__":
     print("=" * 70)
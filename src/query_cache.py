@@ -5,134 +5,498 @@ Week 2 Day 12 - Cache expensive queries with TTL
 
 import json
 import hashlib
+import sqlite3
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pathlib import Path
+import numpy as np
 from config import Config
 
+try:
+    import simsimd
+
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+try:
+    import xxhash
+
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(data) -> bytes:
+    """Serialize a cached result or metadata (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(data).encode()
+
+
+def _loads(data):
+    """Inverse of _dumps; also reads rows written as text by older versions"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class QueryCache:
-    """Cache system for expensive queries (API calls, LLM responses)"""
+    """Cache system for expensive queries (API calls, LLM responses)
 
-    def __init__(self):
+    Two tiers: a bounded in-memory LRU of hot entries and a SQLite file
+    (cold.sqlite) holding every entry. Cold hits are promoted to memory.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        max_memory_entries: int = 1000,
+        quiet: bool = False,
+    ):
+        # quiet: skip per-operation output (hits, saves) on hot paths
+        self.quiet = quiet
         self.cache_dir = Config.CACHE_DIR
         self.default_ttl_days = Config.CACHE_TTL_DAYS
 
         self.cache_dir = Path(self.cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.default_ttl = timedelta(days=self.default_ttl_days)
-        # Stats
-        self.stats = {"hits": 0, "misses": 0, "saves": 0}
+        # Stats (plain int attributes: bumped on every get/set)
+        self._hits = self._misses = self._saves = self._semantic_hits = 0
+
+        # Hot tier: query hash -> entry, least recently used first
+        self.max_memory_entries = max_memory_entries
+        self._hot: OrderedDict = OrderedDict()
+
+        # Semantic index over hot entries: int8 query embeddings + cache keys
+        self.similarity_threshold = similarity_threshold
+        self._key_embeds: Optional[np.ndarray] = None
+        self._key_inv_norms: Optional[np.ndarray] = None
+        self._key_hashes: List[str] = []
+
+        # Cold tier
+        self.cold_path = self.cache_dir / "cold.sqlite"
+        self.db = sqlite3.connect(self.cold_path, check_same_thread=False)
+        # WAL: each write-through set() appends to the log instead of
+        # rewriting pages under a rollback journal
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS cold_cache ("
+            "key TEXT PRIMARY KEY, query TEXT, result TEXT, embedding BLOB, "
+            "cached_at TEXT, expires_at TEXT, ttl_days INTEGER, metadata TEXT)"
+        )
+        # Expiry sweeps and the warm-up query filter on expires_at
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS cold_cache_expires "
+            "ON cold_cache (expires_at)"
+        )
+        self._import_json_entries()
+        self._rekey_cold_entries()
+        self._warm_hot_tier()
 
-        print(f"💾 Query Cache initialized")
-        print(f"   Cache dir: {self.cache_dir}")
-        print(f"   Default TTL: {self.default_ttl_days} days")
+        if not quiet:
+            print(f"💾 Query Cache initialized")
+            print(f"   Cache dir: {self.cache_dir}")
+            print(f"   Default TTL: {self.default_ttl_days} days")
+            print(f"   In-memory entries: {len(self._hot)}/{max_memory_entries}")
+            print(f"   SIMD similarity: {SIMSIMD_AVAILABLE}")
 
     def _hash_query(self, query: str) -> str:
-        """Generate hash for query (cache key)"""
-        return hashlib.md5(query.lower().strip().encode()).hexdigest()
+        """Generate hash for query (cache key); not security-sensitive"""
+        data = query.lower().strip().encode()
+        if XXHASH_AVAILABLE:
+            return xxhash.xxh3_64_hexdigest(data)
+        return hashlib.md5(data).hexdigest()
+
+    def _normalize(self, embedding) -> np.ndarray:
+        """L2-normalize embedding so cosine similarity is a dot product"""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _quantize(self, embedding) -> np.ndarray:
+        """Quantize embedding to int8 with a per-vector scale (4x less RAM)
+
+        Cosine similarity is scale-invariant, so the scale is not stored.
+        """
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        peak = np.abs(vector).max()
+        scale = 127.0 / peak if peak > 0 else 1.0
+        return np.round(vector * scale).astype(np.int8)
+
+    def _inv_norm(self, vector: np.ndarray) -> float:
+        """1 / L2 norm (0 for a zero vector, so it never matches)"""
+        norm = np.linalg.norm(vector.astype(np.float32))
+        return 1.0 / norm if norm > 0 else 0.0
+
+    def _import_json_entries(self):
+        """Move entries from the old one-JSON-file-per-query layout into SQLite"""
+        for cache_file in self.cache_dir.glob("*.json"):
+            try:
+                data = _loads(cache_file.read_bytes())
+                embedding = data.get("embedding")
+                entry = {
+                    "query": data["query"],
+                    "result": data["result"],
+                    "cached_at": data["cached_at"],
+                    "expires_at": data["expires_at"],
+                    "ttl_days": data["ttl_days"],
+                    "metadata": data.get("metadata", {}),
+                    "embedding": self._quantize(embedding) if embedding else None,
+                }
+            except Exception:
+                continue  # Skip corrupted files
 
-    def _cache_filepath(self, query_hash: str) -> Path:
-        """Get filepath for cached query"""
-        return self.cache_dir / f"{query_hash}.json"
+            self._write_cold(self._hash_query(entry["query"]), entry)
+            cache_file.unlink()
 
-    def get(self, query: str) -> Optional[Dict[str, Any]]:
-        """Get cached result if exists and not expired"""
-        query_hash = self._hash_query(query)
-        cache_file = self._cache_filepath(query_hash)
+    def _rekey_cold_entries(self):
+        """Re-hash entries keyed by the other hash function (xxh3 vs MD5)"""
+        key_length = len(self._hash_query(""))
+        rows = self.db.execute(
+            "SELECT key, query FROM cold_cache WHERE length(key) != ?",
+            (key_length,),
+        ).fetchall()
+        if rows:
+            with self.db:
+                self.db.executemany(
+                    "UPDATE OR REPLACE cold_cache SET key = ? WHERE key = ?",
+                    [(self._hash_query(query), key) for key, query in rows],
+                )
+
+    def _warm_hot_tier(self):
+        """Load the most recently cached, unexpired entries into memory"""
+        rows = self.db.execute(
+            "SELECT * FROM cold_cache WHERE expires_at > ? ORDER BY rowid DESC LIMIT ?",
+            (datetime.now().isoformat(), self.max_memory_entries),
+        ).fetchall()
+        for row in reversed(rows):
+            self._remember(row[0], self._row_to_entry(row))
+
+    def _row_to_entry(self, row) -> Dict[str, Any]:
+        """Turn a cold_cache row into an in-memory entry"""
+        _, query, result, embedding, cached_at, expires_at, ttl_days, metadata = row
+        return {
+            "query": query,
+            "result": _loads(result),
+            "cached_at": cached_at,
+            "expires_at": expires_at,
+            # Epoch seconds, parsed once so hits compare plain floats
+            "cached_ts": datetime.fromisoformat(cached_at).timestamp(),
+            "expires_ts": datetime.fromisoformat(expires_at).timestamp(),
+            "ttl_days": ttl_days,
+            "metadata": _loads(metadata),
+            "embedding": (
+                np.frombuffer(embedding, dtype=np.int8) if embedding else None
+            ),
+        }
 
-        if not cache_file.exists():
-            self.stats["misses"] += 1
+    def _write_cold(self, query_hash: str, entry: Dict[str, Any]):
+        """Persist an entry to the cold tier"""
+        self._write_cold_many([(query_hash, entry)])
+
+    def _write_cold_many(self, items: List[tuple]):
+        """Persist (query_hash, entry) pairs in a single transaction"""
+        rows = [
+            (
+                query_hash,
+                entry["query"],
+                _dumps(entry["result"]),
+                (
+                    entry["embedding"].tobytes()
+                    if entry["embedding"] is not None
+                    else None
+                ),
+                entry["cached_at"],
+                entry["expires_at"],
+                entry["ttl_days"],
+                _dumps(entry["metadata"]),
+            )
+            for query_hash, entry in items
+        ]
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO cold_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def _read_cold(self, query_hash: str) -> Optional[Dict[str, Any]]:
+        """Fetch an entry from the cold tier"""
+        row = self.db.execute(
+            "SELECT * FROM cold_cache WHERE key = ?", (query_hash,)
+        ).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    def _remember(self, query_hash: str, entry: Dict[str, Any]):
+        """Insert into the hot tier, evicting least recently used entries
+
+        Every entry is already in cold.sqlite, so eviction only frees memory.
+        """
+        self._hot[query_hash] = entry
+        self._hot.move_to_end(query_hash)
+        while len(self._hot) > self.max_memory_entries:
+            evicted_hash, _ = self._hot.popitem(last=False)
+            self._remove_from_index(evicted_hash)
+
+        if entry["embedding"] is not None:
+            self._add_to_index(query_hash, entry["embedding"])
+
+    def _forget(self, query_hash: str) -> bool:
+        """Remove an entry from both tiers"""
+        in_memory = self._hot.pop(query_hash, None) is not None
+        self._remove_from_index(query_hash)
+        with self.db:
+            deleted = self.db.execute(
+                "DELETE FROM cold_cache WHERE key = ?", (query_hash,)
+            ).rowcount
+        return in_memory or deleted > 0
+
+    def _add_to_index(self, query_hash: str, vector: np.ndarray):
+        """Add (or replace) an int8 query embedding in the semantic index"""
+        self._remove_from_index(query_hash)
+
+        # Reciprocal norm computed once here, so lookups only multiply
+        inv_norm = np.float32(self._inv_norm(vector))
+
+        if self._key_embeds is None:
+            self._key_embeds = vector[None, :]
+            self._key_inv_norms = np.array([inv_norm], dtype=np.float32)
+        else:
+            self._key_embeds = np.vstack([self._key_embeds, vector])
+            self._key_inv_norms = np.append(self._key_inv_norms, inv_norm)
+        self._key_hashes.append(query_hash)
+
+    def _remove_from_index(self, query_hash: str):
+        """Drop a query embedding from the semantic index"""
+        if query_hash not in self._key_hashes:
+            return
+
+        row = self._key_hashes.index(query_hash)
+        del self._key_hashes[row]
+        self._key_embeds = np.delete(self._key_embeds, row, axis=0)
+        self._key_inv_norms = np.delete(self._key_inv_norms, row)
+
+    def _find_similar(self, embedding) -> Optional[str]:
+        """Find cache key of the most similar cached query above threshold"""
+        if not self._key_hashes:
             return None
 
-        try:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                cached_data = json.load(f)
+        query = self._quantize(embedding)
 
-            # Check expiry
-            expires_at = datetime.fromisoformat(cached_data["expires_at"])
+        if SIMSIMD_AVAILABLE:
+            # SIMD i8 kernels (AVX2/AVX-512/NEON) return cosine *distance*
+            distances = simsimd.cdist(
+                query[None, :], self._key_embeds, metric="cosine"
+            )
+            sims = 1.0 - np.asarray(distances)[0]
+        else:
+            dots = self._key_embeds.astype(np.float32) @ query.astype(np.float32)
+            sims = dots * self._key_inv_norms * self._inv_norm(query)
 
-            if datetime.now() > expires_at:
-                # Expired - delete cache file
-                cache_file.unlink()
-                self.stats["misses"] += 1
-                print(f"   ⏰ Cache expired: {query[:50]}...")
-                return None
+        best = int(np.argmax(sims))
 
-            # Valid cache hit!
-            self.stats["hits"] += 1
-            age_hours = (
-                datetime.now() - datetime.fromisoformat(cached_data["cached_at"])
-            ).total_seconds() / 3600
-            print(f"   ✅ Cache HIT! ({age_hours:.1f}h old)")
+        if sims[best] < self.similarity_threshold:
+            return None
 
-            return cached_data["result"]
+        return self._key_hashes[best]
 
-        except Exception as e:
-            print(f"   ⚠️ Cache read error: {e}")
-            self.stats["misses"] += 1
+    def get(self, query: str, embedding=None) -> Optional[Dict[str, Any]]:
+        """Get cached result if exists and not expired
+
+        Probes memory first, then cold.sqlite. With a query embedding,
+        paraphrases of a hot cached query also hit when their cosine
+        similarity exceeds similarity_threshold. embedding may be a
+        zero-argument callable, invoked only if the exact lookup misses.
+        """
+        query_hash = self._hash_query(query)
+        entry = self._hot.get(query_hash)
+
+        if entry is None:
+            entry = self._read_cold(query_hash)
+            if entry is not None:
+                self._remember(query_hash, entry)  # Promote cold hit
+
+        if entry is None and embedding is not None and self._key_hashes:
+            if callable(embedding):
+                embedding = embedding()
+            similar_hash = self._find_similar(embedding)
+            if similar_hash:
+                query_hash = similar_hash
+                entry = self._hot[query_hash]
+                self._semantic_hits += 1
+
+        if entry is None:
+            self._misses += 1
             return None
 
+        # Check expiry
+        now = time.time()
+
+        if now > entry["expires_ts"]:
+            # Expired - delete from both tiers
+            self._forget(query_hash)
+            self._misses += 1
+            if not self.quiet:
+                print(f"   ⏰ Cache expired: {query[:50]}...")
+            return None
+
+        # Valid cache hit!
+        self._hot.move_to_end(query_hash)
+        self._hits += 1
+        if not self.quiet:
+            age_hours = (now - entry["cached_ts"]) / 3600
+            print(f"   ✅ Cache HIT! ({age_hours:.1f}h old)")
+
+        return entry["result"]
+
     def set(
         self,
         query: str,
         result: Any,
         ttl_days: Optional[int] = None,
         metadata: Optional[Dict] = None,
+        embedding=None,
     ):
-        """Cache query result with TTL"""
+        """Cache query result with TTL (and query embedding for semantic hits)"""
         query_hash = self._hash_query(query)
-        cache_file = self._cache_filepath(query_hash)
+        entry = self._make_entry(query, result, ttl_days, metadata, embedding)
+
+        try:
+            self._write_cold(query_hash, entry)
+            self._remember(query_hash, entry)
+
+            self._saves += 1
+            if not self.quiet:
+                print(f"   💾 Cached: {query[:50]}... (TTL: {entry['ttl_days']}d)")
+
+        except Exception as e:
+            print(f"   ⚠️ Cache write error: {e}")
+
+    def set_many(
+        self,
+        items: List[tuple],
+        ttl_days: Optional[int] = None,
+        metadata: Optional[Dict] = None,
+    ) -> int:
+        """Cache (query, result) pairs with one commit for the whole batch
+
+        One transaction means one journal sync instead of one per entry.
+        Returns the number of entries written.
+        """
+        pairs = [
+            (
+                self._hash_query(query),
+                self._make_entry(query, result, ttl_days, metadata),
+            )
+            for query, result in items
+        ]
+        if not pairs:
+            return 0
+
+        try:
+            self._write_cold_many(pairs)
+        except Exception as e:
+            print(f"   ⚠️ Cache write error: {e}")
+            return 0
+
+        for query_hash, entry in pairs:
+            self._remember(query_hash, entry)
+        self._saves += len(pairs)
+        if not self.quiet:
+            print(f"   💾 Cached {len(pairs)} entries")
+        return len(pairs)
 
+    def _make_entry(
+        self,
+        query: str,
+        result: Any,
+        ttl_days: Optional[int] = None,
+        metadata: Optional[Dict] = None,
+        embedding=None,
+    ) -> Dict[str, Any]:
+        """Build an in-memory cache entry stamped with its expiry"""
         ttl = timedelta(days=ttl_days) if ttl_days else self.default_ttl
+        cached_at = datetime.now()
+        expires_at = cached_at + ttl
 
-        cache_data = {
+        return {
             "query": query,
             "result": result,
-            "cached_at": datetime.now().isoformat(),
-            "expires_at": (datetime.now() + ttl).isoformat(),
+            "cached_at": cached_at.isoformat(),
+            "expires_at": expires_at.isoformat(),
+            "cached_ts": cached_at.timestamp(),
+            "expires_ts": expires_at.timestamp(),
             "ttl_days": ttl_days or self.default_ttl.days,
             "metadata": metadata or {},
+            "embedding": (
+                self._quantize(self._normalize(embedding))
+                if embedding is not None
+                else None
+            ),
         }
 
-        try:
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(cache_data, f, indent=2)
-
-            self.stats["saves"] += 1
-            print(f"   💾 Cached: {query[:50]}... (TTL: {cache_data['ttl_days']}d)")
-
-        except Exception as e:
-            print(f"   ⚠️ Cache write error: {e}")
+    def warmup(self, queries: List[str]) -> int:
+        """Promote the cached entries for queries into memory in bulk
+
+        Fetches all missing keys with batched IN (...) lookups instead
+        of one cold-tier round trip per later get(). Returns the number
+        of entries loaded.
+        """
+        wanted = {self._hash_query(query) for query in queries}
+        missing = [key for key in wanted if key not in self._hot]
+        missing = missing[: self.max_memory_entries]
+        now = datetime.now().isoformat()
+
+        loaded = 0
+        for start in range(0, len(missing), 500):  # SQLite variable limit
+            batch = missing[start : start + 500]
+            placeholders = ", ".join("?" * len(batch))
+            rows = self.db.execute(
+                f"SELECT * FROM cold_cache WHERE key IN ({placeholders}) "
+                "AND expires_at > ?",
+                (*batch, now),
+            ).fetchall()
+            for row in rows:
+                self._remember(row[0], self._row_to_entry(row))
+            loaded += len(rows)
+
+        return loaded
 
     def invalidate(self, query: str) -> bool:
         """Manually invalidate cached query"""
-        query_hash = self._hash_query(query)
-        cache_file = self._cache_filepath(query_hash)
-
-        if cache_file.exists():
-            cache_file.unlink()
-            print(f"   🗑️  Cache invalidated: {query[:50]}...")
+        if self._forget(self._hash_query(query)):
+            if not self.quiet:
+                print(f"   🗑️  Cache invalidated: {query[:50]}...")
             return True
         return False
 
     def clear_expired(self) -> int:
         """Remove all expired cache entries"""
-        expired_count = 0
+        now = datetime.now()
+        now_ts = now.timestamp()
 
-        for cache_file in self.cache_dir.glob("*.json"):
-            try:
-                with open(cache_file, "r") as f:
-                    data = json.load(f)
+        for query_hash, entry in list(self._hot.items()):
+            if entry["expires_ts"] < now_ts:
+                del self._hot[query_hash]
+                self._remove_from_index(query_hash)
 
-                expires_at = datetime.fromisoformat(data["expires_at"])
-
-                if datetime.now() > expires_at:
-                    cache_file.unlink()
-                    expired_count += 1
-
-            except Exception:
-                pass  # Skip corrupted files
+        with self.db:
+            expired_count = self.db.execute(
+                "DELETE FROM cold_cache WHERE expires_at < ?", (now.isoformat(),)
+            ).rowcount
 
         if expired_count > 0:
             print(f"   🗑️  Cleared {expired_count} expired cache entries")
@@ -141,44 +505,65 @@ class QueryCache:
 
     def clear_all(self) -> int:
         """Clear entire cache"""
-        count = 0
-        for cache_file in self.cache_dir.glob("*.json"):
-            cache_file.unlink()
-            count += 1
+        with self.db:
+            count = self.db.execute("DELETE FROM cold_cache").rowcount
+
+        self._hot.clear()
+        self._key_embeds = None
+        self._key_inv_norms = None
+        self._key_hashes = []
 
         print(f"   🗑️  Cleared {count} cache entries")
         return count
 
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Raw counters as a dict"""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "saves": self._saves,
+            "semantic_hits": self._semantic_hits,
+        }
+
     def get_stats(self) -> Dict:
         """Get cache statistics"""
-        total_requests = self.stats["hits"] + self.stats["misses"]
-        hit_rate = (
-            (self.stats["hits"] / total_requests * 100) if total_requests > 0 else 0
-        )
+        total_requests = self._hits + self._misses
+        hit_rate = (self._hits / total_requests * 100) if total_requests > 0 else 0
 
-        cache_files = list(self.cache_dir.glob("*.json"))
-        total_size = sum(f.stat().st_size for f in cache_files) / 1024  # KB
+        (cached_entries,) = self.db.execute(
+            "SELECT COUNT(*) FROM cold_cache"
+        ).fetchone()
+        (page_count,) = self.db.execute("PRAGMA page_count").fetchone()
+        (page_size,) = self.db.execute("PRAGMA page_size").fetchone()
+        total_size = page_count * page_size / 1024  # KB
 
         return {
-            "hits": self.stats["hits"],
-            "misses": self.stats["misses"],
-            "saves": self.stats["saves"],
+            **self.stats,
             "total_requests": total_requests,
             "hit_rate": round(hit_rate, 1),
-            "cached_entries": len(cache_files),
+            "cached_entries": cached_entries,
+            "memory_entries": len(self._hot),
             "cache_size_kb": round(total_size, 2),
         }
 
-    def print_stats(self):
-        """Print cache statistics"""
+    def format_stats(self) -> list:
+        """Cache statistics as display lines"""
         stats = self.get_stats()
 
-        print(f"\n📊 Cache Statistics:")
-        print(f"   Hits: {stats['hits']}")
-        print(f"   Misses: {stats['misses']}")
-        print(f"   Hit rate: {stats['hit_rate']}%")
-        print(f"   Cached entries: {stats['cached_entries']}")
-        print(f"   Cache size: {stats['cache_size_kb']} KB")
+        return [
+            f"\n📊 Cache Statistics:",
+            f"   Hits: {stats['hits']} ({stats['semantic_hits']} semantic)",
+            f"   Misses: {stats['misses']}",
+            f"   Hit rate: {stats['hit_rate']}%",
+            f"   Cached entries: {stats['cached_entries']}"
+            f" ({stats['memory_entries']} in memory)",
+            f"   Cache size: {stats['cache_size_kb']} KB",
+        ]
+
+    def print_stats(self):
+        """Print cache statistics"""
+        print("\n".join(self.format_stats()))
 
 
 # Quick test
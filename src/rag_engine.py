@@ -4,17 +4,172 @@ Week 1 Day 3 - Your personal knowledge base brain
 """
 
 import os
+import hashlib
+import mmap
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
+import numpy as np
 import chromadb
+from chromadb.utils import embedding_functions
 from document_chunker import DocumentChunker
 from document_cache import DocumentCache
 from config import Config
 
+try:
+    import simsimd
+
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+
+class EmbeddingCache:
+    """LRU + SQLite cache in front of an embedding function
+
+    Vectors are persisted as float16 (half the disk and read I/O of
+    float32) and widened back to float32 when loaded.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        model_name: str = "all-MiniLM-L6-v2",
+        db_path: str = "data/cache/embeddings.sqlite",
+        max_entries: int = 2048,
+    ):
+        self.embedder = embedder
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings_f16 "
+            "(key TEXT PRIMARY KEY, vector BLOB)"
+        )
+        self._migrate_float32_rows()
+
+        # Warm the LRU with the most recently stored embeddings
+        rows = self.db.execute(
+            "SELECT key, vector FROM embeddings_f16 ORDER BY rowid DESC LIMIT ?",
+            (max_entries,),
+        ).fetchall()
+        for key, blob in reversed(rows):
+            self._lru[key] = self._unpack(blob)
+
+    def _migrate_float32_rows(self):
+        """Convert a cache written with float32 vectors to float16 rows"""
+        legacy = self.db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='embeddings'"
+        ).fetchone()
+        if not legacy:
+            return
+
+        rows = self.db.execute("SELECT key, vector FROM embeddings").fetchall()
+        self.db.executemany(
+            "INSERT OR IGNORE INTO embeddings_f16 (key, vector) VALUES (?, ?)",
+            [(key, self._pack(np.frombuffer(blob, np.float32))) for key, blob in rows],
+        )
+        self.db.execute("DROP TABLE embeddings")
+        self.db.commit()
+
+    @staticmethod
+    def _pack(vector: np.ndarray) -> bytes:
+        return vector.astype(np.float16).tobytes()
+
+    @staticmethod
+    def _unpack(blob: bytes) -> np.ndarray:
+        return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+
+    def _key(self, text: str) -> str:
+        """Cache key for text under this model"""
+        return hashlib.sha256(f"{self.model_name}|{text}".encode()).hexdigest()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Insert into LRU, evicting least recently used entries"""
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def encode(self, texts) -> np.ndarray:
+        """Embed texts (L2-normalized), running the model only on cache misses"""
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        keys = [self._key(text) for text in texts]
+
+        with self._lock:
+            vectors = []
+            for key in keys:
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                vectors.append(vector)
+
+            # Second tier: persisted embeddings
+            missing = [i for i, v in enumerate(vectors) if v is None]
+            if missing:
+                placeholders = ",".join("?" * len(missing))
+                query = (
+                    "SELECT key, vector FROM embeddings_f16 "
+                    f"WHERE key IN ({placeholders})"
+                )
+                stored = dict(
+                    self.db.execute(query, [keys[i] for i in missing]).fetchall()
+                )
+                for i in missing:
+                    if keys[i] in stored:
+                        vectors[i] = self._unpack(stored[keys[i]])
+                        self._remember(keys[i], vectors[i])
+
+            missing = [i for i, v in enumerate(vectors) if v is None]
+            self.stats["hits"] += len(texts) - len(missing)
+            self.stats["misses"] += len(missing)
+
+        if missing:
+            # Run the model once over all misses
+            fresh = np.asarray(
+                self.embedder([texts[i] for i in missing]), dtype=np.float32
+            )
+            # Store unit vectors so cosine similarity is a plain dot product
+            fresh /= np.linalg.norm(fresh, axis=1, keepdims=True) + 1e-12
+
+            with self._lock:
+                rows = []
+                for i, vector in zip(missing, fresh):
+                    vectors[i] = vector
+                    self._remember(keys[i], vector)
+                    rows.append((keys[i], self._pack(vector)))
+
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO embeddings_f16 (key, vector) VALUES (?, ?)",
+                    rows,
+                )
+                self.db.commit()
+
+        return np.vstack(vectors)
+
 
 class KnowledgeBase:
     # Vector database for RAG
 
-    def __init__(self, kb_path="data/knowledge_base"):
+    # Bumped on every write so all instances drop their in-memory index
+    index_generation = 0
+
+    # Query embeddings memoized between begin_turn() calls (LRU-bounded, so
+    # callers that never start a turn, e.g. watchers, don't grow it forever)
+    TURN_EMBED_MAX = 256
+
+    def __init__(self, kb_path="data/knowledge_base", int8_mode=None, quiet=None):
         self.kb_path = Config.KNOWLEDGE_BASE_PATH
         db_path = Config.CHROMA_DB_PATH
         collection_name = (
@@ -23,64 +178,473 @@ class KnowledgeBase:
             else "career_knowledge"
         )
 
+        # Per-file progress lines during ingestion (summaries always print)
+        self.quiet = Config.QUIET_INGEST if quiet is None else quiet
+
+        if Config.BULK_INGEST:
+            self._tune_for_bulk_load(db_path)
+
         # Initialize ChromaDB (NEW API)
         self.client = chromadb.PersistentClient(path=db_path)
 
-        # Get or create collection
+        # Same model Chroma uses for the collection (all-MiniLM-L6-v2),
+        # cached so repeated queries skip the model forward pass
+        self.embedder = EmbeddingCache(
+            embedding_functions.DefaultEmbeddingFunction(),
+            db_path=os.path.join(Config.CACHE_DIR, "embeddings.sqlite"),
+        )
+
+        # Per-turn memo: {normalized text: embedding}, reset by begin_turn()
+        self._turn_embed_cache = OrderedDict()
+        self._turn_embed_lock = threading.Lock()
+
+        # Resident search index: normalized embedding matrix + documents
+        # (int8_mode stores it quantized to int8 for 4x less memory)
+        self.int8_mode = Config.RAG_INT8_INDEX if int8_mode is None else int8_mode
+        self._index_vectors = None
+        self._index_inv_norms = None
+        # Collection size when it is too big for RAM and search goes to HNSW
+        self._ann_size = 0
+        self._index_documents = []
+        self._index_built_for = -1
+        # Search threads share one rebuild; fields are swapped in together
+        self._index_lock = threading.Lock()
+
+        # Formatted search results per (query, n_results), dropped on writes
+        self._search_cached = lru_cache(maxsize=256)(self._search)
+        self._search_cached_for = KnowledgeBase.index_generation
+
+        # Get or create collection. The HNSW graph is persisted every 10000
+        # added vectors instead of every 1000, and built with ef 100. Chroma
+        # applies this only when the collection is created: existing DBs
+        # keep their old HNSW parameters until rebuilt.
         self.collection = self.client.get_or_create_collection(
             name="career_knowledge",
             metadata={"description": "Economist skills and transition goals"},
+            configuration={"hnsw": {"sync_threshold": 10000, "ef_construction": 100}},
         )
 
         # Initialize document chunker
         self.chunker = DocumentChunker(chunk_size=500, overlap=50)
 
         # Initialize document cache
-        self.doc_cache = DocumentCache()
+        self.doc_cache = DocumentCache(quiet=self.quiet)
         print(f"📚 Knowledge Base initialized")
         print(f"   Stored documents: {self.collection.count()}")
 
-    def load_knowledge_files(self):
-        """Load all text files from knowledge base folder"""
+    def _tune_for_bulk_load(self, db_path: str):
+        """Put Chroma's SQLite file in WAL mode before the client opens it
+
+        Chroma's connections live in its native backend, so only the
+        journal mode (persisted in the file itself) can be set from here.
+        A new database is tuned on the next start.
+        """
+        sqlite_path = os.path.join(db_path, "chroma.sqlite3")
+        if not os.path.exists(sqlite_path):
+            return
+
+        conn = sqlite3.connect(sqlite_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not tune vector DB for bulk load: {e}")
+        finally:
+            conn.close()
+
+    def _log(self, message: str):
+        """Per-file progress output, unless quiet (or empty)
+
+        Loops join their lines into one message: one write per folder.
+        """
+        if message and not self.quiet:
+            print(message)
+
+    def _read_text(self, filepath: str) -> str:
+        """Decode a UTF-8 file straight from a read-only mapping (no bytes copy)
+
+        Newlines are translated like a text-mode open(), so CRLF files keep
+        the same stored text and content_hash.
+        """
+        with open(filepath, "rb") as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return ""  # Zero-length files cannot be mapped
+            with mapped:
+                text = str(mapped, "utf-8")
+        return text.replace("\r\n", "\n").replace("\r", "\n")
+
+    def _collect_knowledge_files(self):
+        """Read skills .txt files concurrently -> (ids, documents, metadatas)"""
         skills_folder = os.path.join(self.kb_path, "skills")
 
-        if not os.path.exists(skills_folder):
+        try:
+            with os.scandir(skills_folder) as it:
+                entries = [e for e in it if e.name.endswith(".txt") and e.is_file()]
+        except FileNotFoundError:
             print(f"⚠️ Create folder first: {skills_folder}")
+            return None
+
+        filenames = [e.name for e in entries]
+        paths = [e.path for e in entries]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            documents = list(executor.map(self._read_text, paths))
+
+        self._log("\n".join(f"   ✓ Loaded: {filename}" for filename in filenames))
+
+        ids = [os.path.splitext(filename)[0] for filename in filenames]
+        metadatas = [{"source": f, "type": "skill_inventory"} for f in filenames]
+        return ids, documents, metadatas
+
+    def load_knowledge_files(self):
+        """Load all text files from knowledge base folder"""
+        collected = self._collect_knowledge_files()
+        if collected is None:
             return
 
-        files_loaded = 0
-        for filename in os.listdir(skills_folder):
-            if filename.endswith(".txt"):
-                filepath = os.path.join(skills_folder, filename)
-
-                # Read file content
-                with open(filepath, "r", encoding="utf-8") as f:
-                    content = f.read()
-
-                # Add to vector database
-                doc_id = filename.replace(".txt", "")
-                self.collection.upsert(
-                    documents=[content],
-                    ids=[doc_id],
-                    metadatas=[{"source": filename, "type": "skill_inventory"}],
+        # Add new or changed files in batched embedding passes
+        self.add_changed_documents(*collected)
+        print(f"\n✅ Loaded {len(collected[0])} knowledge files into vector DB")
+
+    def load_knowledge_and_job_posts(
+        self, folder_path="data/monitored_folders/job_posts"
+    ):
+        """Load skills files and job posts: reads in parallel, one upsert pass"""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            knowledge = executor.submit(self._collect_knowledge_files)
+            jobs = executor.submit(self._collect_job_posts, folder_path)
+            sources = [knowledge.result(), jobs.result()]
+
+        ids, documents, metadatas = [], [], []
+        for collected in filter(None, sources):
+            ids += collected[0]
+            documents += collected[1]
+            metadatas += collected[2]
+
+        # Embedding batches span both sources
+        self.add_changed_documents(ids, documents, metadatas)
+
+        knowledge_count = len(sources[0][0]) if sources[0] else 0
+        print(
+            f"\n✅ Loaded {knowledge_count} knowledge files and "
+            f"{len(ids) - knowledge_count} job post(s) into vector DB"
+        )
+
+    def add_changed_documents(self, ids, documents, metadatas, batch_size=200):
+        """Embed and upsert only new or changed documents -> number written"""
+        ids, documents, metadatas = self._drop_unchanged(ids, documents, metadatas)
+        self.add_documents_batch(ids, documents, metadatas, batch_size=batch_size)
+        return len(ids)
+
+    def _drop_unchanged(self, ids, documents, metadatas):
+        """Filter out documents already stored with the same content
+
+        Stamps each metadata with a content_hash and compares it against
+        the stored records in one lookup, so re-runs upsert nothing.
+        """
+        metadatas = [
+            {**meta, "content_hash": self.content_hash(doc, meta)}
+            for doc, meta in zip(documents, metadatas)
+        ]
+        if not ids:
+            return ids, documents, metadatas
+
+        stored = self.collection.get(ids=ids, include=["metadatas"])
+        stored_hashes = {
+            doc_id: (meta or {}).get("content_hash")
+            for doc_id, meta in zip(stored["ids"], stored["metadatas"])
+        }
+
+        keep = [
+            i
+            for i, doc_id in enumerate(ids)
+            if stored_hashes.get(doc_id) != metadatas[i]["content_hash"]
+        ]
+        return (
+            [ids[i] for i in keep],
+            [documents[i] for i in keep],
+            [metadatas[i] for i in keep],
+        )
+
+    @staticmethod
+    def content_hash(document: str, metadata: dict) -> str:
+        """Hash of a document and its metadata as they would be stored
+
+        Stored as metadata["content_hash"]; every writer must use this one
+        formula, or unchanged documents get re-embedded.
+        """
+        payload = f"{document}\0{sorted(metadata.items())}".encode()
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def add_documents_batch(self, ids, documents, metadatas, batch_size=200):
+        """Embed and upsert documents with one model pass per batch
+
+        Each batch is one Chroma transaction; 100-250 items per upsert
+        amortizes the per-call SQLite and index overhead. The next batch is
+        embedded while the previous one is written (one upsert in flight,
+        since the local store serializes writes anyway).
+        """
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            in_flight = None
+            for start in range(0, len(ids), batch_size):
+                end = start + batch_size
+                embeddings = self.embedder.encode(documents[start:end]).tolist()
+                if in_flight:
+                    in_flight.result()
+                in_flight = writer.submit(
+                    self.collection.upsert,
+                    ids=ids[start:end],
+                    documents=documents[start:end],
+                    embeddings=embeddings,
+                    metadatas=metadatas[start:end],
                 )
+            if in_flight:
+                in_flight.result()
+
+        if ids:
+            self.invalidate_index()
+
+    def _queue_documents(self, pending, ids, documents, metadatas, flush_at=200):
+        """Append to a pending (ids, documents, metadatas) batch; upsert if full"""
+        pending[0].extend(ids)
+        pending[1].extend(documents)
+        pending[2].extend(metadatas)
+        if len(pending[0]) >= flush_at:
+            self._flush_documents(pending)
+
+    def _flush_documents(self, pending):
+        """Upsert and clear a pending batch built by _queue_documents
+
+        Records whose stored content_hash matches are skipped.
+        """
+        if pending[0]:
+            self.add_changed_documents(*pending)
+            for part in pending:
+                part.clear()
+
+    def _iter_parsed(
+        self, files, parse_file, parse_one, executor_cls=ProcessPoolExecutor
+    ):
+        """Yield (file, data, cached) as parsed documents become available
+
+        Cache hits come first. Misses are parsed in parallel and yielded in
+        order as they finish, so the caller chunks and upserts earlier files
+        while later ones are still parsing. parse_file parses in-process;
+        parse_one is the worker (picklable for processes) used when several
+        files miss the cache. data is None if parsing failed.
+        """
+        # One pass over the in-memory cache index
+        hits = self.doc_cache.get_many(files)
+        for f, data in hits.items():
+            yield f, data, True
+
+        uncached = [f for f in files if f not in hits]
+        fresh = {}
+
+        try:
+            workers = min(os.cpu_count() or 1, len(uncached))
+            if workers > 1:
+                # One worker per file (processes for CPU-bound Python parsing)
+                with executor_cls(max_workers=workers) as executor:
+                    results = executor.map(parse_one, map(str, uncached))
+                    for f, data in zip(uncached, results):
+                        if data:
+                            fresh[f] = data
+                        yield f, data, False
+            else:
+                for f in uncached:
+                    data = parse_file(f)
+                    if data:
+                        fresh[f] = data
+                    yield f, data, False
+        finally:
+            # Cache for next time (one index write for the whole folder)
+            self.doc_cache.set_many(fresh)
+
+    def begin_turn(self):
+        """Start a new user turn (drops turn-local embeddings)"""
+        with self._turn_embed_lock:
+            self._turn_embed_cache = OrderedDict()
+
+    def embed(self, texts) -> np.ndarray:
+        """Embed texts with the collection's model, shape (n, d) unit float32"""
+        # The model is uncased, so lowercased text embeds identically
+        keys = [text.strip().lower() for text in texts]
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+
+        found = {}
+        missing = []
+        with self._turn_embed_lock:
+            cache = self._turn_embed_cache
+            for key in dict.fromkeys(keys):
+                if key in cache:
+                    cache.move_to_end(key)
+                    found[key] = cache[key]
+                else:
+                    missing.append(key)
+
+        if missing:
+            vectors = self.embedder.encode(missing)
+            with self._turn_embed_lock:
+                cache = self._turn_embed_cache
+                for key, vector in zip(missing, vectors):
+                    found[key] = cache[key] = vector
+                while len(cache) > self.TURN_EMBED_MAX:
+                    cache.popitem(last=False)
+
+        return np.vstack([found[k] for k in keys])
+
+    def invalidate_index(self):
+        """Mark in-memory search index stale (call after collection writes)"""
+        KnowledgeBase.index_generation += 1
+
+    def _load_index(self):
+        """Materialize normalized embeddings in RAM if the collection changed
+
+        Returns a consistent (vectors, inv_norms, documents, ann_size)
+        snapshot, so a concurrent rebuild never mixes old and new fields.
+        """
+        with self._index_lock:
+            if self._index_built_for != KnowledgeBase.index_generation:
+                self._rebuild_index()
+            return (
+                self._index_vectors,
+                self._index_inv_norms,
+                self._index_documents,
+                self._ann_size,
+            )
 
-                files_loaded += 1
-                print(f"   ✓ Loaded: {filename}")
+    def _rebuild_index(self):
+        """Build the index into locals, then swap every field in at once"""
+        generation = KnowledgeBase.index_generation
+        vectors, inv_norms, documents = None, None, []
+
+        # Large collections: use Chroma's persistent HNSW index (O(log N))
+        ann_size = self.collection.count()
+        if ann_size <= Config.RAG_RESIDENT_INDEX_MAX:
+            ann_size = 0
+            data = self.collection.get(include=["embeddings", "documents"])
+
+            documents = data["documents"] or []
+            if documents:
+                vectors = np.asarray(data["embeddings"], dtype=np.float32)
+                norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                vectors = vectors / norms
+
+                if self.int8_mode:
+                    vectors = self._quantize(vectors)
+                    inv_norms = self._inv_norms(vectors)
+
+        (
+            self._index_vectors,
+            self._index_inv_norms,
+            self._index_documents,
+            self._ann_size,
+        ) = (vectors, inv_norms, documents, ann_size)
+        self._index_built_for = generation
+
+    def _quantize(self, vectors: np.ndarray) -> np.ndarray:
+        """Row-wise int8 quantization (scale 127 / max|v|)
+
+        Cosine similarity is scale-invariant, so scales are not kept.
+        """
+        peaks = np.abs(vectors).max(axis=1, keepdims=True)
+        peaks[peaks == 0] = 1.0
+        return np.round(vectors * (127.0 / peaks)).astype(np.int8)
+
+    def _inv_norms(self, vectors: np.ndarray) -> np.ndarray:
+        """1 / L2 norm per row (0 for zero rows)"""
+        norms = np.linalg.norm(vectors.astype(np.float32), axis=1)
+        return np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+
+    def _int8_scores(
+        self, query_vectors: np.ndarray, vectors: np.ndarray, inv_norms: np.ndarray
+    ) -> np.ndarray:
+        """Cosine scores of queries against the int8 index"""
+        queries = self._quantize(query_vectors)
+
+        if SIMSIMD_AVAILABLE:
+            # SIMD i8 kernels return cosine *distance*
+            distances = simsimd.cdist(queries, vectors, metric="cosine")
+            return 1.0 - np.asarray(distances)
+
+        dots = queries.astype(np.float32) @ vectors.astype(np.float32).T
+        return dots * self._inv_norms(queries)[:, None] * inv_norms
+
+    def _top_k(self, query_vectors: np.ndarray, n_results: int):
+        """Brute-force cosine top-k: one matmul + argpartition per query
+
+        Query vectors come from embed() and are already unit length.
+        Collections above RAG_RESIDENT_INDEX_MAX go through Chroma's HNSW.
+        """
+        vectors, inv_norms, documents, ann_size = self._load_index()
+
+        if ann_size:
+            # Unit vectors: Chroma's L2 ranking equals cosine ranking
+            results = self.collection.query(
+                query_embeddings=query_vectors.tolist(),
+                n_results=min(n_results, ann_size),
+                include=["documents"],
+            )
+            return results["documents"]
 
-        print(f"\n✅ Loaded {files_loaded} knowledge files into vector DB")
+        if vectors is None:
+            return [[] for _ in range(len(query_vectors))]
 
-    def search(self, query, n_results=2):
-        """Search knowledge base for relevant information"""
-        results = self.collection.query(query_texts=[query], n_results=n_results)
+        if vectors.dtype == np.int8:
+            scores = self._int8_scores(query_vectors, vectors, inv_norms)
+        else:
+            scores = query_vectors @ vectors.T
 
-        if not results["documents"][0]:
+        k = min(n_results, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+        # argpartition is unordered - sort the k winners by score
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+
+        return [[documents[i] for i in row] for row in top]
+
+    def format_context(self, documents, max_chars=2000) -> str:
+        """Prompt-ready context: documents joined and capped at max_chars
+
+        Whole files are stored as single documents, so uncapped context can
+        run to thousands of prompt tokens; best matches come first.
+        """
+        if not documents:
             return "No relevant knowledge found."
 
-        # Format results
-        context = "\n\n".join(results["documents"][0])
+        context = "\n\n---\n\n".join(documents)
+        if len(context) > max_chars:
+            context = context[:max_chars].rstrip() + " …"
         return context
 
+    def search(self, query, n_results=2):
+        """Search knowledge base for relevant information"""
+        if self._search_cached_for != KnowledgeBase.index_generation:
+            self._search_cached.cache_clear()
+            self._search_cached_for = KnowledgeBase.index_generation
+        return self._search_cached(query, n_results)
+
+    def _search(self, query, n_results):
+        documents = self._top_k(self.embed([query]), n_results)[0]
+        return self.format_context(documents)
+
+    def search_batch(self, queries, n_results):
+        """Search several queries with one embedding pass and one index scan"""
+        if isinstance(n_results, int):
+            n_results = [n_results] * len(queries)
+
+        results = self._top_k(self.embed(queries), max(n_results))
+
+        # Slice each query's hits down to its own n_results
+        return [
+            self.format_context(documents[:n])
+            for documents, n in zip(results, n_results)
+        ]
+
     def get_stats(self):
         """Show knowledge base statistics"""
         count = self.collection.count()
@@ -88,43 +652,47 @@ class KnowledgeBase:
         print(f"   Total documents: {count}")
         if count > 0:
             # Sample a document
-            sample = self.collection.peek(limit=1)
+            sample = self.collection.get(limit=1, include=[])
             print(f"   Sample document: {sample['ids'][0]}")
 
-    def load_job_posts(self, folder_path="data/monitored_folders/job_posts"):
-        """Load job descriptions from folder"""
+    def _collect_job_posts(self, folder_path: str):
+        """Read job post files -> (ids, documents, metadatas)"""
         from file_processor import FileProcessor
 
-        processor = FileProcessor()
+        processor = FileProcessor(quiet=self.quiet)
         job_files = processor.load_folder(folder_path)
 
         if not job_files:
             print("⚠️ No job posts found")
-            return
+            return None
 
-        jobs_loaded = 0
+        ids, documents, metadatas = [], [], []
         for job_data in job_files:
-            # Add to vector database
-            doc_id = (
-                f"job_{job_data['filename'].replace('.txt', '').replace('.pdf', '')}"
+            doc_id = f"job_{os.path.splitext(job_data['filename'])[0]}"
+
+            ids.append(doc_id)
+            documents.append(job_data["content"])
+            metadatas.append(
+                {
+                    "source": job_data["filename"],
+                    "type": "job_description",
+                    "word_count": job_data["word_count"],
+                }
             )
 
-            self.collection.upsert(
-                documents=[job_data["content"]],
-                ids=[doc_id],
-                metadatas=[
-                    {
-                        "source": job_data["filename"],
-                        "type": "job_description",
-                        "word_count": job_data["word_count"],
-                    }
-                ],
-            )
+        self._log("\n".join(f"   ✓ Indexed: {job['filename']}" for job in job_files))
+        return ids, documents, metadatas
+
+    def load_job_posts(self, folder_path="data/monitored_folders/job_posts"):
+        """Load job descriptions from folder"""
+        collected = self._collect_job_posts(folder_path)
+        if collected is None:
+            return
 
-            jobs_loaded += 1
-            print(f"   ✓ Indexed: {job_data['filename']}")
+        # Add new or changed posts in batched embedding passes
+        self.add_changed_documents(*collected)
 
-        print(f"\n✅ Loaded {jobs_loaded} job post(s) into vector DB")
+        print(f"\n✅ Loaded {len(collected[0])} job post(s) into vector DB")
 
     def add_document_with_chunks(self, filepath: str, doc_type: str = "general"):
         """Add document with smart chunking"""
@@ -144,23 +712,21 @@ class KnowledgeBase:
         print(f"\n📄 Processing: {file_data['filename']}")
         print(f"   Created {len(chunks)} smart chunks")
 
-        # Add each chunk to vector DB
-        for chunk in chunks:
-            doc_id = f"{doc_type}_{file_data['filename']}_{chunk.chunk_id}"
-
-            self.collection.upsert(
-                documents=[chunk.text],
-                ids=[doc_id],
-                metadatas=[
-                    {
-                        "source": file_data["filename"],
-                        "type": doc_type,
-                        "chunk_id": chunk.chunk_id,
-                        "heading": chunk.heading,
-                        "chunk_type": chunk.chunk_type,
-                    }
-                ],
-            )
+        # Add new or changed chunks to vector DB in one batched upsert
+        self.add_changed_documents(
+            [f"{doc_type}_{file_data['filename']}_{c.chunk_id}" for c in chunks],
+            [c.text for c in chunks],
+            [
+                {
+                    "source": file_data["filename"],
+                    "type": doc_type,
+                    "chunk_id": c.chunk_id,
+                    "heading": c.heading,
+                    "chunk_type": c.chunk_type,
+                }
+                for c in chunks
+            ],
+        )
 
         # Measure quality
         quality = self.chunker.measure_quality(chunks)
@@ -170,9 +736,9 @@ class KnowledgeBase:
 
     def load_pdfs(self, folder_path="data/pdfs"):
         """Load PDF documents with caching"""
-        from pdf_parser import PDFParser
+        from pdf_parser import PDFParser, _parse_one
 
-        parser = PDFParser()
+        parser = PDFParser(quiet=self.quiet)
         folder = Path(folder_path)
 
         if not folder.exists():
@@ -187,24 +753,16 @@ class KnowledgeBase:
 
         pdfs_loaded = 0
         pdfs_from_cache = 0
+        pending = ([], [], [])  # Chunks across files, upserted in batches
 
-        for pdf_file in pdf_files:
-            # Try cache first
-            cached_data = self.doc_cache.get(pdf_file)
-
-            if cached_data:
-                # Use cached data
-                pdf_data = cached_data
-                pdfs_from_cache += 1
-            else:
-                # Parse fresh
-                pdf_data = parser.parse_file(pdf_file)
+        # Cache first, then the misses as parallel parsing finishes them
+        for _, pdf_data, cached_data in self._iter_parsed(
+            pdf_files, parser.parse_file, _parse_one
+        ):
+            if not pdf_data:
+                continue
 
-                if pdf_data:
-                    # Cache for next time
-                    self.doc_cache.set(pdf_file, pdf_data)
-                else:
-                    continue
+            pdfs_from_cache += cached_data
 
             # Add to vector DB (same as before)
             if pdf_data["word_count"] > 500:
@@ -212,33 +770,29 @@ class KnowledgeBase:
                     pdf_data["content"], pdf_data["filename"]
                 )
 
-                for chunk in chunks:
-                    doc_id = f"pdf_{pdf_data['filename']}_{chunk.chunk_id}"
-
-                    self.collection.upsert(
-                        documents=[chunk.text],
-                        ids=[doc_id],
-                        metadatas=[
-                            {
-                                "source": pdf_data["filename"],
-                                "type": "pdf_document",
-                                "chunk_id": chunk.chunk_id,
-                                "page_count": str(pdf_data["page_count"]),
-                                "title": pdf_data["metadata"].get("title", ""),
-                            }
-                        ],
-                    )
+                # Fields shared by every chunk are built once per file
+                shared = {
+                    "source": pdf_data["filename"],
+                    "type": "pdf_document",
+                    "page_count": str(pdf_data["page_count"]),
+                    "title": pdf_data["metadata"].get("title", ""),
+                }
+                self._queue_documents(
+                    pending,
+                    [f"pdf_{pdf_data['filename']}_{c.chunk_id}" for c in chunks],
+                    [c.text for c in chunks],
+                    [{**shared, "chunk_id": c.chunk_id} for c in chunks],
+                )
 
                 if not cached_data:
-                    print(f"\n📄 Processing: {pdf_data['filename']}")
-                    print(f"   Created {len(chunks)} chunks")
+                    self._log(f"\n📄 Processing: {pdf_data['filename']}")
+                    self._log(f"   Created {len(chunks)} chunks")
             else:
-                doc_id = f"pdf_{pdf_data['filename']}"
-
-                self.collection.upsert(
-                    documents=[pdf_data["content"]],
-                    ids=[doc_id],
-                    metadatas=[
+                self._queue_documents(
+                    pending,
+                    [f"pdf_{pdf_data['filename']}"],
+                    [pdf_data["content"]],
+                    [
                         {
                             "source": pdf_data["filename"],
                             "type": "pdf_document",
@@ -250,17 +804,18 @@ class KnowledgeBase:
                 )
 
                 if not cached_data:
-                    print(f"   ✓ Indexed: {pdf_data['filename']}")
+                    self._log(f"   ✓ Indexed: {pdf_data['filename']}")
 
             pdfs_loaded += 1
 
+        self._flush_documents(pending)
         print(f"\n✅ Loaded {pdfs_loaded} PDF(s) ({pdfs_from_cache} from cache)")
 
     def load_docx(self, folder_path="data/docx"):
         """Load Word documents with caching"""
-        from docx_parser import DOCXParser
+        from docx_parser import DOCXParser, _parse_one
 
-        parser = DOCXParser()
+        parser = DOCXParser(quiet=self.quiet)
         folder = Path(folder_path)
 
         if not folder.exists():
@@ -277,21 +832,16 @@ class KnowledgeBase:
 
         docx_loaded = 0
         docx_from_cache = 0
+        pending = ([], [], [])  # Chunks across files, upserted in batches
 
-        for docx_file in docx_files:
-            # Try cache first
-            cached_data = self.doc_cache.get(docx_file)
-
-            if cached_data:
-                docx_data = cached_data
-                docx_from_cache += 1
-            else:
-                docx_data = parser.parse_file(docx_file)
+        # Cache first, then the misses as parallel parsing finishes them
+        for _, docx_data, cached_data in self._iter_parsed(
+            docx_files, parser.parse_file, _parse_one
+        ):
+            if not docx_data:
+                continue
 
-                if docx_data:
-                    self.doc_cache.set(docx_file, docx_data)
-                else:
-                    continue
+            docx_from_cache += cached_data
 
             # Add to vector DB (same chunking logic as before)
             if docx_data["word_count"] > 500:
@@ -299,33 +849,29 @@ class KnowledgeBase:
                     docx_data["content"], docx_data["filename"]
                 )
 
-                for chunk in chunks:
-                    doc_id = f"docx_{docx_data['filename']}_{chunk.chunk_id}"
-
-                    self.collection.upsert(
-                        documents=[chunk.text],
-                        ids=[doc_id],
-                        metadatas=[
-                            {
-                                "source": docx_data["filename"],
-                                "type": "docx_document",
-                                "chunk_id": chunk.chunk_id,
-                                "title": docx_data["metadata"].get("title", ""),
-                                "author": docx_data["metadata"].get("author", ""),
-                            }
-                        ],
-                    )
+                # Fields shared by every chunk are built once per file
+                shared = {
+                    "source": docx_data["filename"],
+                    "type": "docx_document",
+                    "title": docx_data["metadata"].get("title", ""),
+                    "author": docx_data["metadata"].get("author", ""),
+                }
+                self._queue_documents(
+                    pending,
+                    [f"docx_{docx_data['filename']}_{c.chunk_id}" for c in chunks],
+                    [c.text for c in chunks],
+                    [{**shared, "chunk_id": c.chunk_id} for c in chunks],
+                )
 
                 if not cached_data:
-                    print(f"\n📝 Processing: {docx_data['filename']}")
-                    print(f"   Created {len(chunks)} chunks")
+                    self._log(f"\n📝 Processing: {docx_data['filename']}")
+                    self._log(f"   Created {len(chunks)} chunks")
             else:
-                doc_id = f"docx_{docx_data['filename']}"
-
-                self.collection.upsert(
-                    documents=[docx_data["content"]],
-                    ids=[doc_id],
-                    metadatas=[
+                self._queue_documents(
+                    pending,
+                    [f"docx_{docx_data['filename']}"],
+                    [docx_data["content"]],
+                    [
                         {
                             "source": docx_data["filename"],
                             "type": "docx_document",
@@ -336,10 +882,11 @@ class KnowledgeBase:
                 )
 
                 if not cached_data:
-                    print(f"   ✓ Indexed: {docx_data['filename']}")
+                    self._log(f"   ✓ Indexed: {docx_data['filename']}")
 
             docx_loaded += 1
 
+        self._flush_documents(pending)
         print(f"\n✅ Loaded {docx_loaded} DOCX file(s) ({docx_from_cache} from cache)")
 
     def load_images(
@@ -355,11 +902,11 @@ class KnowledgeBase:
             print("⚠️  No images folder found")
             return
 
-        image_extensions = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.bmp"]
-        image_files = []
-
-        for ext in image_extensions:
-            image_files.extend(folder.glob(f"**/{ext}"))
+        # One directory walk, filtered by suffix
+        image_extensions = {".png", ".jpg", ".jpeg", ".gif", ".bmp"}
+        image_files = [
+            f for f in folder.rglob("*") if f.suffix.lower() in image_extensions
+        ]
 
         if not image_files:
             print("⚠️  No images found")
@@ -367,41 +914,40 @@ class KnowledgeBase:
 
         images_loaded = 0
         images_from_cache = 0
+        pending = ([], [], [])  # Images across files, upserted in batches
 
-        for img_file in image_files:
-            # Try cache first
-            cached_data = self.doc_cache.get(img_file)
-
-            if cached_data:
-                img_data = cached_data
-                images_from_cache += 1
-            else:
-                img_data = ocr.extract_text_from_image(
-                    img_file, lang=lang, auto_detect=auto_detect
-                )
+        # Cache first, then OCR the misses concurrently. Tesseract runs as
+        # a subprocess per image, so threads keep every core busy
+        extract = partial(
+            ocr.extract_text_from_image, lang=lang, auto_detect=auto_detect
+        )
+        for _, img_data, cached_data in self._iter_parsed(
+            image_files, extract, extract, executor_cls=ThreadPoolExecutor
+        ):
+            if not img_data:
+                continue
 
-                if img_data:
-                    self.doc_cache.set(img_file, img_data)
-                else:
-                    continue
+            images_from_cache += cached_data
 
             # Skip low-content images
             if img_data["word_count"] < min_words:
                 continue
 
             # Add to vector DB
-            doc_id = f"image_{img_data['filename']}"
-
-            self.collection.upsert(
-                documents=[img_data["content"]],
-                ids=[doc_id],
-                metadatas=[
+            self._queue_documents(
+                pending,
+                [f"image_{img_data['filename']}"],
+                [img_data["content"]],
+                [
                     {
                         "source": img_data["filename"],
                         "type": "image_ocr",
                         "word_count": str(img_data["word_count"]),
                         "ocr_language": img_data["metadata"]["ocr_language"],
-                        "ocr_confidence": str(img_data["metadata"]["ocr_confidence"]),
+                        # Numeric, so range filters run inside Chroma
+                        "ocr_confidence": float(
+                            img_data["metadata"]["ocr_confidence"]
+                        ),
                     }
                 ],
             )
@@ -409,8 +955,9 @@ class KnowledgeBase:
             images_loaded += 1
 
             if not cached_data:
-                print(f"   ✓ Indexed: {img_data['filename']}")
+                self._log(f"   ✓ Indexed: {img_data['filename']}")
 
+        self._flush_documents(pending)
         print(f"\n✅ Loaded {images_loaded} image(s) ({images_from_cache} from cache)")
 
 
@@ -5,10 +5,59 @@ Week 2 Day 9 - Extract and track skill levels from metadata
 
 from rag_engine import KnowledgeBase
 from markdown_parser import MarkdownParser
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, TypedDict
+import heapq
 import json
 import os
+import re
+import sys
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class HistoryEntry(TypedDict):
+    """One proficiency record in skills_history.json"""
+
+    date: str
+    proficiency: int
+
+
+try:
+    import msgspec
+
+    # Schema-typed decoder: validates while decoding to plain dicts, in C
+    _HISTORY_DECODER = msgspec.json.Decoder(Dict[str, List[HistoryEntry]])
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+try:
+    from rapidfuzz import fuzz, process
+
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+# Minimum partial_ratio score for a job skill to count as a match
+_MATCH_CUTOFF = 70
+
+# Splits skill names into tokens, keeping names like "c++", "c#" and "node.js"
+_TOKEN_SPLIT = re.compile(r"[^a-z0-9+#.]+")
+
+# Most-improved skills shown in the weekly report
+_TOP_IMPROVEMENTS = 10
+
+# Proficiency bars for 0-10, built once
+_BARS = tuple("█" * i + "░" * (10 - i) for i in range(11))
 
 
 class SkillsTracker:
@@ -18,84 +67,148 @@ class SkillsTracker:
         self.kb = kb
         self.parser = MarkdownParser()
         self.history_file = "data/skills_history.json"
+        self._dirty = False
+        self._skills_cache = None
+        self._skills_cache_key = None
         self.load_history()
         print("📊 Skills Tracker initialized")
 
     def load_history(self):
-        """Load historical skill data"""
-        if os.path.exists(self.history_file):
+        """Load historical skill data (msgspec or orjson when installed)"""
+        if not os.path.exists(self.history_file):
+            self.history = {}
+        elif MSGSPEC_AVAILABLE:
+            with open(self.history_file, "rb") as f:
+                buf = f.read()
+            try:
+                self.history = _HISTORY_DECODER.decode(buf)
+            except msgspec.ValidationError as e:
+                print(f"⚠️ Skills history schema mismatch ({e}), loading untyped")
+                self.history = msgspec.json.decode(buf)
+        elif ORJSON_AVAILABLE:
+            with open(self.history_file, "rb") as f:
+                self.history = orjson.loads(f.read())
+        else:
             with open(self.history_file, "r") as f:
                 self.history = json.load(f)
-        else:
-            self.history = {}
 
     def save_history(self):
-        """Save skill history to file"""
+        """Save skill history to file (msgspec or orjson when installed)"""
         os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
+        if MSGSPEC_AVAILABLE:
+            with open(self.history_file, "wb") as f:
+                buf = msgspec.json.encode(self.history)
+                f.write(msgspec.json.format(buf, indent=2))
+            return
+        if ORJSON_AVAILABLE:
+            with open(self.history_file, "wb") as f:
+                f.write(orjson.dumps(self.history, option=orjson.OPT_INDENT_2))
+            return
         with open(self.history_file, "w") as f:
             json.dump(self.history, indent=2, fp=f)
 
-    def extract_all_skills(self) -> Dict[str, Dict]:
-        """Extract all skills from knowledge base"""
-        # Query for skill notes
-        results = self.kb.collection.get(where={"type": "skill_note"})
+    def flush(self):
+        """Write pending history updates to disk (no-op when clean)"""
+        if self._dirty:
+            self.save_history()
+            self._dirty = False
+
+    @contextmanager
+    def batch(self):
+        """Group several updates into a single history write on exit"""
+        try:
+            yield self
+        finally:
+            self.flush()
+
+    def _skills_key(self) -> tuple:
+        """Cache key that changes whenever the KB or history file changes"""
+        mtime = (
+            os.path.getmtime(self.history_file)
+            if os.path.exists(self.history_file)
+            else 0
+        )
+        # The index generation catches upserts, which leave count() unchanged
+        return (
+            self.kb.index_generation,
+            self.kb.collection.count(),
+            mtime,
+        )
 
-        skills = {}
+    def extract_all_skills(self) -> Dict[str, Dict]:
+        """Extract all skills from knowledge base (memoized until the KB changes)"""
+        key = self._skills_key()
+        if key == self._skills_cache_key:
+            return self._skills_cache
 
-        if results and results["ids"]:
-            for i, doc_id in enumerate(results["ids"]):
-                metadata = results["metadatas"][i]
+        self._skills_cache = self._query_skills()
+        self._skills_cache_key = key
+        return self._skills_cache
 
-                skill_name = metadata.get("source", doc_id).replace(".md", "")
-                proficiency = metadata.get("proficiency", 0)
+    def _query_skills(self) -> Dict[str, Dict]:
+        """Query skill notes from the knowledge base"""
+        # Query for skill notes
+        results = self.kb.collection.get(
+            where={"type": "skill_note"}, include=["metadatas"]
+        )
 
-                skills[skill_name] = {
-                    "proficiency": proficiency,
-                    "category": metadata.get("category", "general"),
-                    "tags": metadata.get("tags", []),
-                    "last_updated": datetime.now().isoformat(),
-                }
+        if not results or not results["ids"]:
+            return {}
 
-        return skills
+        now = datetime.now().isoformat()
+        return {
+            metadata.get("source", doc_id).removesuffix(".md"): {
+                "proficiency": metadata.get("proficiency", 0),
+                "category": metadata.get("category", "general"),
+                "tags": metadata.get("tags", []),
+                "last_updated": now,
+            }
+            for doc_id, metadata in zip(results["ids"], results["metadatas"])
+        }
 
-    def extract_practiced_skills(self, days: int = 7) -> List[str]:
+    def extract_practiced_skills(self, days: int = 7) -> Counter:
         """Extract skills practiced in last N days from daily notes"""
-        results = self.kb.collection.get(where={"type": "daily_note"})
+        results = self.kb.collection.get(
+            where={"type": "daily_note"}, include=["metadatas"]
+        )
 
-        practiced = []
+        # Counter.update counts in C; feed it one flat chain of skill names
+        skill_counts = Counter()
 
         if results and results["metadatas"]:
-            for metadata in results["metadatas"]:
-                skills = metadata.get("skills", [])
-                if isinstance(skills, list):
-                    practiced.extend(skills)
-                elif isinstance(skills, str):
-                    # Handle string format
-                    practiced.append(skills)
-
-        # Remove duplicates, maintain frequency
-        from collections import Counter
-
-        skill_counts = Counter(practiced)
+            skill_counts.update(
+                chain.from_iterable(map(self._skill_list, results["metadatas"]))
+            )
 
         return skill_counts
 
+    @staticmethod
+    def _skill_list(metadata: Dict) -> List[str]:
+        """Skills of a daily note (list; older rows hold a ', '-joined string)"""
+        skills = metadata.get("skills") or []
+        return skills.split(", ") if isinstance(skills, str) else skills
+
     def update_skill_history(self, skill_name: str, proficiency: int):
-        """Record proficiency change"""
+        """Record proficiency change (in memory until flush() or batch() exits)"""
         if skill_name not in self.history:
             self.history[skill_name] = []
 
         entry = {"date": datetime.now().isoformat(), "proficiency": proficiency}
 
         self.history[skill_name].append(entry)
-        self.save_history()
+        self._dirty = True
+        self._skills_cache_key = None
 
     def get_skill_progress(self, skill_name: str) -> Optional[Dict]:
         """Get progress for specific skill"""
-        if skill_name not in self.history or len(self.history[skill_name]) < 2:
+        records = self.history.get(skill_name)
+        if not records or len(records) < 2:
             return None
+        return self._progress_from_records(skill_name, records)
 
-        records = self.history[skill_name]
+    @staticmethod
+    def _progress_from_records(skill_name: str, records: List[Dict]) -> Dict:
+        """Summarize first vs last record of a skill's history"""
         first = records[0]
         last = records[-1]
 
@@ -111,68 +224,128 @@ class SkillsTracker:
 
     def generate_progress_report(self) -> str:
         """Generate weekly progress summary"""
+        return "".join(self._report_lines())
+
+    def print_progress_report(self, file=None):
+        """Stream the weekly progress summary to a file (stdout by default)"""
+        file = file or sys.stdout
+        file.writelines(self._report_lines())
+        file.write("\n")
+
+    def _report_lines(self) -> Iterator[str]:
+        """Yield the weekly progress summary line by line"""
+        # Fresh install: skip both Chroma queries
+        if self.kb.collection.count() == 0:
+            yield "📊 No skills indexed yet. Add notes to data/knowledge_base/skills/"
+            return
+
         skills = self.extract_all_skills()
         practiced = self.extract_practiced_skills(days=7)
 
-        report = "📊 WEEKLY SKILLS REPORT\n"
-        report += "=" * 60 + "\n\n"
+        yield "📊 WEEKLY SKILLS REPORT\n"
+        yield "=" * 60 + "\n\n"
 
         # Current skills
-        report += "📚 Current Skills Inventory:\n"
+        yield "📚 Current Skills Inventory:\n"
         for skill, data in sorted(
             skills.items(), key=lambda x: x[1]["proficiency"], reverse=True
         ):
             proficiency = data["proficiency"]
-            bar = "█" * proficiency + "░" * (10 - proficiency)
-            report += f"  {skill:<20} [{bar}] {proficiency}/10\n"
-
-        report += f"\n📈 Most Practiced (Last 7 Days):\n"
-        for skill, count in practiced.most_common(5):
-            report += f"  {skill:<20} ({count} mentions)\n"
+            bar = _BARS[min(max(proficiency, 0), 10)]
+            yield f"  {skill:<20} [{bar}] {proficiency}/10\n"
 
-        # Progress tracking
-        report += f"\n🚀 Progress This Week:\n"
+        # Only skills with history can have progress; walk those directly
         improvements = []
-        for skill_name in skills.keys():
-            progress = self.get_skill_progress(skill_name)
-            if progress and progress["improvement"] > 0:
+        for skill, records in self.history.items():
+            if len(records) < 2 or skill not in skills:
+                continue
+            progress = self._progress_from_records(skill, records)
+            if progress["improvement"] > 0:
                 improvements.append(progress)
 
+        yield "\n📈 Most Practiced (Last 7 Days):\n"
+        for skill, count in practiced.most_common(5):
+            yield f"  {skill:<20} ({count} mentions)\n"
+
+        # Progress tracking
+        yield "\n🚀 Progress This Week:\n"
         if improvements:
-            for prog in sorted(
-                improvements, key=lambda x: x["improvement"], reverse=True
+            for prog in heapq.nlargest(
+                _TOP_IMPROVEMENTS, improvements, key=lambda x: x["improvement"]
             ):
-                report += f"  {prog['skill']:<20} {prog['start_level']}→{prog['current_level']} (+{prog['improvement']})\n"
+                yield (
+                    f"  {prog['skill']:<20} {prog['start_level']}→"
+                    f"{prog['current_level']} (+{prog['improvement']})\n"
+                )
         else:
-            report += "  No proficiency updates yet. Update your skill notes!\n"
-
-        report += "\n" + "=" * 60
-
-        return report
+            yield "  No proficiency updates yet. Update your skill notes!\n"
+
+        yield "\n" + "=" * 60
+
+    @staticmethod
+    def _match_skill(
+        required: str, names: List[str], lowered: List[str]
+    ) -> Optional[str]:
+        """Best current skill name for a required skill (RapidFuzz when installed)"""
+        required = required.lower()
+        if RAPIDFUZZ_AVAILABLE:
+            match = process.extractOne(
+                required,
+                lowered,
+                scorer=fuzz.partial_ratio,
+                score_cutoff=_MATCH_CUTOFF,
+            )
+            return names[match[2]] if match else None
+
+        # Substring fallback over the names lowercased once by the caller
+        for name, name_lc in zip(names, lowered):
+            if required in name_lc:
+                return name
+        return None
 
     def compare_with_job_requirements(self, job_skills: List[str]) -> Dict:
         """Compare current skills against job requirements"""
+        # Empty KB: every required skill is a gap, no matching needed
+        if self.kb.collection.count() == 0:
+            return {
+                "matches": [],
+                "gaps": [
+                    {"skill": skill, "proficiency": 0, "status": "gap"}
+                    for skill in job_skills
+                ],
+                "readiness_score": 0.0,
+                "skills_matched": 0,
+                "total_required": len(job_skills),
+            }
+
         current_skills = self.extract_all_skills()
+        names = list(current_skills)
+        lowered = [name.lower() for name in names]
+
+        # Exact token -> skill name index; first skill to claim a token wins
+        index = {}
+        for name, name_lc in zip(names, lowered):
+            for token in _TOKEN_SPLIT.split(name_lc):
+                if token:
+                    index.setdefault(token, name)
 
         matches = []
         gaps = []
 
         for required_skill in job_skills:
             # Fuzzy match (lowercase, partial)
-            found = False
-            for current_skill, data in current_skills.items():
-                if required_skill.lower() in current_skill.lower():
-                    matches.append(
-                        {
-                            "skill": required_skill,
-                            "proficiency": data["proficiency"],
-                            "status": "match",
-                        }
-                    )
-                    found = True
-                    break
-
-            if not found:
+            current_skill = index.get(required_skill.lower())
+            if current_skill is None:
+                current_skill = self._match_skill(required_skill, names, lowered)
+            if current_skill is not None:
+                matches.append(
+                    {
+                        "skill": required_skill,
+                        "proficiency": current_skills[current_skill]["proficiency"],
+                        "status": "match",
+                    }
+                )
+            else:
                 gaps.append(
                     {"skill": required_skill, "proficiency": 0, "status": "gap"}
                 )
@@ -198,7 +371,8 @@ if __name__ == "__main__":
     kb = KnowledgeBase()
     tracker = SkillsTracker(kb)
 
-    print("\n" + tracker.generate_progress_report())
+    print()
+    tracker.print_progress_report()
 
     print("\n--- Testing Job Comparison ---")
     job_reqs = ["Python", "Pandas", "SQL", "Git"]
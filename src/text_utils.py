@@ -0,0 +1,14 @@
+"""
+Text Utilities
+Small text helpers shared by the parsers and the quality analyzer
+"""
+
+import re
+
+# Runs of non-whitespace; \s is Unicode-aware, matching str.split()
+_WORD_RE = re.compile(r"\S+")
+
+
+def count_words(text: str) -> int:
+    """Same count as len(text.split()), without building a word list"""
+    return sum(1 for _ in _WORD_RE.finditer(text))
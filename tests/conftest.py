@@ -0,0 +1,45 @@
+"""
+Shared pytest fixtures
+One CareerCoach (and its KnowledgeBase) per test session
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from config import Config
+from main import CareerCoach
+
+
+@pytest.fixture(scope="session")
+def coach():
+    """Career coach shared by every test (embedding model loads once)
+
+    The Obsidian watcher stays off, and the coach's threads are stopped
+    when the session ends.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(Config, "ENABLE_OBSIDIAN_WATCHER", False)
+        coach = CareerCoach()
+        yield coach
+        coach.stop_monitoring()
+
+
+@pytest.fixture(scope="session")
+def kb(coach):
+    """The shared coach's knowledge base"""
+    return coach.kb
+
+
+@pytest.fixture
+def isolated_config(tmp_path, monkeypatch):
+    """Run in tmp_path with every cache and DB path pointing inside it"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(Config, "CHROMA_DB_PATH", str(tmp_path / "vector_db"))
+    monkeypatch.setattr(Config, "BULK_INGEST", False)
+    monkeypatch.setattr(Config, "RAG_INT8_INDEX", False)
+    return tmp_path
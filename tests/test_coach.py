@@ -23,10 +23,9 @@ def test_llm():
     print(f"   ✅ LLM working: {response[:50]}...")
 
 
-def test_knowledge_base():
+def test_knowledge_base(kb: KnowledgeBase):
     """Test vector database"""
     print("\n🧪 Testing Knowledge Base...")
-    kb = KnowledgeBase()
 
     # Load skills
     kb.load_knowledge_files()
@@ -51,10 +50,9 @@ def test_file_processor():
     print(f"   ✅ Loaded {len(files)} file(s)")
 
 
-def test_coach():
+def test_coach(coach: CareerCoach):
     """Test full coach integration"""
     print("\n🧪 Testing Full Coach...")
-    coach = CareerCoach(enable_watcher=False)
     coach.load_knowledge()
 
     response = coach.chat("What are my top economist skills?")
@@ -69,10 +67,13 @@ def run_all_tests():
     print("=" * 70)
 
     try:
+        # One coach (and knowledge base) for the whole run, like the pytest fixtures
+        coach = CareerCoach()
+
         test_llm()
-        test_knowledge_base()
+        test_knowledge_base(coach.kb)
         test_file_processor()
-        test_coach()
+        test_coach(coach)
 
         print("\n" + "=" * 70)
         print("✅ ALL TESTS PASSED!")
@@ -0,0 +1,89 @@
+"""
+Knowledge Graph Tests
+Pickle sidecar reuse and incremental updates after edits and deletes
+"""
+
+import os
+
+import pytest
+
+from knowledge_graph import KnowledgeGraph
+
+
+def _write(path, text, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))  # Distinct fingerprint even within 1s
+
+
+def _snapshot(graph):
+    """Comparable view of edges, backlinks and nodes"""
+    return (
+        {node: sorted(targets) for node, targets in graph.graph.items() if targets},
+        {node: sorted(sources) for node, sources in graph.backlinks.items()},
+        set(graph.nodes),
+        graph._edge_count,
+    )
+
+
+@pytest.fixture
+def vault(tmp_path):
+    _write(tmp_path / "vault/skills/Python.md", "Uses [[goals/Freelance]] and [[SQL]]")
+    _write(tmp_path / "vault/goals/Freelance.md", "Needs [[skills/Python]]")
+    _write(tmp_path / "vault/daily/2025-01-01.md", "Practiced [[Python]] today")
+    return tmp_path / "vault"
+
+
+def _build(vault, cache_path, use_cache=True):
+    return KnowledgeGraph(None, cache_path=str(cache_path)).build_from_vault(
+        str(vault), use_cache=use_cache
+    )
+
+
+def test_sidecar_restores_graph_without_reparsing(vault, tmp_path):
+    cache_path = tmp_path / "graph.pkl"
+    first = _build(vault, cache_path)
+    assert first.graph["skills/Python"] == ["goals/Freelance", "skills/SQL"]
+    assert sorted(first.backlinks["skills/Python"]) == [
+        "daily/2025-01-01",
+        "goals/Freelance",
+    ]
+
+    second = KnowledgeGraph(None, cache_path=str(cache_path))
+    parsed = []
+    second._add_note_to_graph = lambda *args: parsed.append(args)
+    second.build_from_vault(str(vault))
+
+    assert parsed == []
+    assert _snapshot(second) == _snapshot(first)
+
+
+def test_edit_replaces_only_that_notes_edges(vault, tmp_path):
+    cache_path = tmp_path / "graph.pkl"
+    _build(vault, cache_path)
+
+    _write(
+        vault / "skills/Python.md",
+        "Now links [[projects/Dashboard]] only",
+        mtime=os.path.getmtime(vault / "skills/Python.md") + 10,
+    )
+    updated = _build(vault, cache_path)
+
+    assert updated.graph["skills/Python"] == ["projects/Dashboard"]
+    assert "goals/Freelance" not in updated.backlinks
+    assert "skills/SQL" not in updated.backlinks
+    assert _snapshot(updated) == _snapshot(_build(vault, tmp_path / "fresh.pkl"))
+
+
+def test_deleted_note_is_dropped_from_cached_graph(vault, tmp_path):
+    cache_path = tmp_path / "graph.pkl"
+    _build(vault, cache_path)
+
+    (vault / "goals/Freelance.md").unlink()
+    updated = _build(vault, cache_path)
+
+    assert "goals/Freelance" not in updated.nodes
+    assert "goals/Freelance" not in updated.graph
+    assert updated.backlinks["skills/Python"] == ["daily/2025-01-01"]
+    assert _snapshot(updated) == _snapshot(_build(vault, tmp_path / "fresh.pkl"))
@@ -0,0 +1,25 @@
+"""
+Markdown Parser Tests
+Note type priority: folders before tags, each in declared order
+"""
+
+import pytest
+
+from markdown_parser import MarkdownParser
+
+
+@pytest.mark.parametrize(
+    "filepath, tags, expected",
+    [
+        ("vault/daily/2025-01-01.md", [], "daily_note"),
+        ("vault/daily/projects/x.md", [], "daily_note"),  # Not nearest folder
+        ("vault/projects/skills/x.md", [], "skill_note"),
+        ("vault/inbox/x.md", ["skill", "daily"], "daily_note"),  # Not tag order
+        ("vault/inbox/x.md", ["research", "skill"], "research"),
+        ("vault/goals/x.md", ["daily"], "goal"),  # Folder beats tag
+        ("vault/inbox/x.md", ["python"], "general"),
+    ],
+)
+def test_classify_note_type_priority(filepath, tags, expected):
+    parsed = {"filepath": filepath, "tags": tags, "metadata": {}}
+    assert MarkdownParser().classify_note_type(parsed) == expected
@@ -0,0 +1,59 @@
+"""
+Obsidian Watcher Tests
+Routing events from the single recursive vault watch to folder handlers
+"""
+
+import os
+
+import pytest
+from watchdog.events import FileModifiedEvent, FileMovedEvent
+
+from obsidian_watcher import DispatchingHandler
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.events = []
+
+    def dispatch(self, event):
+        self.events.append((event.event_type, event.src_path))
+
+
+@pytest.fixture
+def vault():
+    root = os.path.join(os.sep, "vault")
+    daily = RecordingHandler()
+    routes = {os.path.join(root, "daily"): daily}
+    return root, DispatchingHandler(root, routes), daily
+
+
+def test_move_into_folder_is_routed_by_destination(vault):
+    root, dispatcher, daily = vault
+    src = os.path.join(root, "inbox", "2025-01-01.md")
+    dest = os.path.join(root, "daily", "2025-01-01.md")
+
+    dispatcher.dispatch(FileMovedEvent(src, dest))
+    assert daily.events == [("created", dest)]
+
+    # Moving it out again is not a daily note event
+    dispatcher.dispatch(FileMovedEvent(dest, src))
+    assert len(daily.events) == 1
+
+
+def test_direct_children_only(vault):
+    root, dispatcher, daily = vault
+    note = os.path.join(root, "daily", "note.md")
+
+    dispatcher.dispatch(FileModifiedEvent(note))
+    dispatcher.dispatch(FileModifiedEvent(os.path.join(root, "daily", "sub", "x.md")))
+    assert daily.events == [("modified", note)]
+
+
+def test_dot_directories_are_ignored(vault):
+    root, dispatcher, daily = vault
+    # Even a route inside a dot-directory is never consulted
+    dispatcher.routes[os.path.join(root, ".obsidian")] = daily
+
+    dispatcher.dispatch(FileModifiedEvent(os.path.join(root, ".obsidian", "a.md")))
+    dispatcher.dispatch(FileModifiedEvent(os.path.join(root, ".git", "index")))
+    assert daily.events == []
@@ -6,14 +6,13 @@ Week 3 Day 16
 from main import CareerCoach
 
 
-def test_pdf_integration():
+def test_pdf_integration(coach: CareerCoach):
     print("=" * 70)
     print("🧪 PDF INTEGRATION TEST")
     print("=" * 70)
 
-    # Initialize coach
-    print("\n1️⃣  Initializing coach...")
-    coach = CareerCoach()
+    # Coach comes from the shared session fixture (see conftest.py)
+    print("\n1️⃣  Using initialized coach...")
 
     # Load knowledge
     print("\n2️⃣  Loading knowledge base...")
@@ -70,4 +69,4 @@ def test_pdf_integration():
 
 
 if __name__ == "__main__":
-    test_pdf_integration()
+    test_pdf_integration(CareerCoach())
@@ -0,0 +1,72 @@
+"""
+PDF Parser Tests
+parse_folder's process pool returns the same results as a serial parse
+"""
+
+import pytest
+
+from pdf_parser import PDF_AVAILABLE, PDFParser
+
+pytestmark = pytest.mark.skipif(not PDF_AVAILABLE, reason="PyPDF2 not installed")
+
+
+def _write_pdf(path, pages):
+    """Minimal PDF with one Helvetica text line per page"""
+    n = len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(n))
+        + b"] /Count %d >>" % n,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        stream = b"BT /F1 12 Tf 72 720 Td (%s) Tj ET" % text.encode()
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1)
+    out += b"startxref\n%d\n%%%%EOF\n" % xref
+    path.write_bytes(bytes(out))
+
+
+@pytest.fixture
+def pdf_folder(tmp_path):
+    sentence = "Python for quantitative finance with pandas and numpy"
+    for name, n_pages in [("alpha", 1), ("beta", 3), ("nested/gamma", 2)]:
+        path = tmp_path / f"{name}.pdf"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_pdf(path, [f"{name} page {p} {sentence}" for p in range(n_pages)])
+    (tmp_path / "notes.txt").write_text("not a pdf")
+    return tmp_path
+
+
+def test_process_pool_matches_serial_parse(pdf_folder):
+    serial = PDFParser(quiet=True)
+    expected = serial.parse_folder(str(pdf_folder), num_workers=1)
+
+    pooled = PDFParser(quiet=True)
+    results = pooled.parse_folder(str(pdf_folder), num_workers=2)
+
+    assert results == expected  # Same files, same order, same content
+    by_name = {r["filename"]: r for r in results}
+    assert sorted(by_name) == ["alpha.pdf", "beta.pdf", "gamma.pdf"]
+    assert "beta page 2 Python" in by_name["beta.pdf"]["content"]
+
+    # Workers count into their own parser; totals are merged back
+    assert pooled.stats == serial.stats
+    assert pooled.stats["files_processed"] == 3
+    assert pooled.stats["pages_extracted"] == 6
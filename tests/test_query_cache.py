@@ -0,0 +1,80 @@
+"""
+Query Cache Tests
+Hot/cold tiers, TTL expiry and semantic hits (offline, no LLM needed)
+"""
+
+import time
+
+import numpy as np
+
+import query_cache
+from query_cache import QueryCache
+
+RESULT = {"answer": "€65-95k for mid-level Python finance roles"}
+
+
+def _unit(*values) -> np.ndarray:
+    vector = np.zeros(16, dtype=np.float32)
+    vector[: len(values)] = values
+    return vector / np.linalg.norm(vector)
+
+
+def test_exact_and_case_insensitive_hit(isolated_config):
+    cache = QueryCache(quiet=True)
+    cache.set("What are Python finance salaries?", RESULT)
+
+    assert cache.get("What are Python finance salaries?") == RESULT
+    assert cache.get("  WHAT ARE PYTHON FINANCE SALARIES?  ") == RESULT
+    assert cache.get("Which Python libraries for finance?") is None
+    assert cache.stats["hits"] == 2
+    assert cache.stats["misses"] == 1
+
+
+def test_semantic_hit_above_threshold_only(isolated_config):
+    cache = QueryCache(similarity_threshold=0.95, quiet=True)
+    cache.set("Python finance salaries", RESULT, embedding=_unit(1.0, 0.1))
+
+    # Paraphrase with a near-identical embedding hits the cached entry
+    assert cache.get("How much do Python quants earn?", _unit(1.0, 0.12)) == RESULT
+    assert cache.stats["semantic_hits"] == 1
+
+    # Unrelated embedding misses; a lazy embedding is only called on a miss
+    assert cache.get("Best hiking trails", lambda: _unit(0.0, 0.0, 1.0)) is None
+    calls = []
+    cache.get("Python finance salaries", lambda: calls.append(1))
+    assert calls == []
+
+
+def test_expired_entry_is_removed_from_both_tiers(isolated_config, monkeypatch):
+    cache = QueryCache(quiet=True)
+    cache.set("Python finance salaries", RESULT, ttl_days=1)
+    assert cache.get("Python finance salaries") == RESULT
+
+    two_days_later = time.time() + 2 * 86400
+    monkeypatch.setattr(query_cache.time, "time", lambda: two_days_later)
+
+    assert cache.get("Python finance salaries") is None
+    assert cache.get_stats()["cached_entries"] == 0
+    assert len(cache._hot) == 0
+
+
+def test_cold_hit_is_promoted_to_hot_tier(isolated_config):
+    cache = QueryCache(max_memory_entries=1, quiet=True)
+    cache.set("first query", {"n": 1})
+    cache.set("second query", {"n": 2})
+
+    first = cache._hash_query("first query")
+    assert first not in cache._hot  # Evicted from memory, still in SQLite
+
+    assert cache.get("first query") == {"n": 1}
+    assert first in cache._hot
+    assert len(cache._hot) == 1
+
+
+def test_entries_survive_restart(isolated_config):
+    QueryCache(quiet=True).set("persisted query", RESULT, embedding=_unit(1.0))
+
+    reopened = QueryCache(quiet=True)
+    assert reopened.get("persisted query") == RESULT
+    # Warmed hot entries keep their semantic index
+    assert reopened.get("persisted question", _unit(1.0, 0.01)) == RESULT
@@ -0,0 +1,159 @@
+"""
+RAG Engine Tests
+Embedding cache and in-memory top-k search (offline fake embedder)
+"""
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from rag_engine import EmbeddingCache, KnowledgeBase
+
+DIM = 16
+
+# Large enough that argpartition's k winners come back unsorted
+N_DOCS = 300
+
+
+class FakeEmbedder:
+    """Deterministic text -> vector model that counts how often it runs"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "big")
+            vectors.append(np.random.default_rng(seed).normal(size=DIM))
+        return vectors
+
+
+def test_embedding_cache_runs_model_only_on_misses(tmp_path):
+    model = FakeEmbedder()
+    cache = EmbeddingCache(model, db_path=str(tmp_path / "embeddings.sqlite"))
+
+    first = cache.encode(["python", "sql"])
+    assert model.calls == 1
+    np.testing.assert_allclose(np.linalg.norm(first, axis=1), 1.0, rtol=1e-5)
+
+    again = cache.encode(["sql", "python", "git"])
+    assert model.calls == 2  # Only "git" reached the model
+    np.testing.assert_array_equal(again[0], first[1])
+    assert cache.stats == {"hits": 2, "misses": 3}
+
+
+def test_embedding_cache_persists_float16_across_instances(tmp_path):
+    db_path = str(tmp_path / "embeddings.sqlite")
+    original = EmbeddingCache(FakeEmbedder(), db_path=db_path).encode(["pandas"])
+
+    model = FakeEmbedder()
+    reopened = EmbeddingCache(model, db_path=db_path, max_entries=0)
+    restored = reopened.encode(["pandas"])
+
+    assert model.calls == 0
+    np.testing.assert_allclose(restored, original, atol=1e-3)
+
+
+@pytest.fixture
+def fake_kb(isolated_config):
+    """KnowledgeBase on a temporary Chroma DB with N_DOCS random documents"""
+    kb = KnowledgeBase(quiet=True)
+    kb.embedder = EmbeddingCache(
+        FakeEmbedder(), db_path=str(isolated_config / "embeddings.sqlite")
+    )
+    documents = [f"document number {i}" for i in range(N_DOCS)]
+    kb.add_documents_batch(
+        [f"doc_{i}" for i in range(N_DOCS)],
+        documents,
+        [{"type": "test"} for _ in documents],
+    )
+    return kb, documents
+
+
+def _brute_force(kb, documents, queries, k):
+    """Reference ranking: full sort of cosine scores"""
+    doc_vectors = kb.embedder.encode(documents)
+    scores = kb.embed(queries) @ doc_vectors.T
+    return [[documents[i] for i in np.argsort(-row)[:k]] for row in scores]
+
+
+def test_top_k_matches_brute_force_ordering(fake_kb):
+    kb, documents = fake_kb
+    queries = [f"query {i}" for i in range(10)]
+
+    for k in (1, 5, 100):
+        expected = _brute_force(kb, documents, queries, k)
+        assert kb._top_k(kb.embed(queries), k) == expected
+
+    # k larger than the collection returns everything, still ranked
+    assert kb._top_k(kb.embed(queries[:1]), N_DOCS + 10) == _brute_force(
+        kb, documents, queries[:1], N_DOCS
+    )
+
+
+def test_concurrent_searches_share_one_consistent_rebuild(fake_kb):
+    kb, documents = fake_kb
+    queries = [f"query {i}" for i in range(8)]
+    expected = _brute_force(kb, documents, queries, 5)
+    kb.invalidate_index()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(lambda q: kb._top_k(kb.embed([q]), 5)[0], queries)
+        )
+
+    assert results == expected
+
+
+def test_int8_index_ranks_exact_match_first(fake_kb):
+    kb, documents = fake_kb
+    kb.int8_mode = True
+    kb.invalidate_index()
+
+    results = kb._top_k(kb.embed(documents[:5]), 3)
+    assert [row[0] for row in results] == documents[:5]
+
+
+def test_search_batch_slices_per_query(fake_kb):
+    kb, documents = fake_kb
+    one, three = kb.search_batch(["python", "sql"], [1, 3])
+
+    assert one.count("---") == 0
+    assert three.count("---") == 2
+
+
+def test_changed_documents_and_vault_batcher_share_one_hash(fake_kb):
+    from obsidian_handlers import UpsertBatcher
+
+    kb, documents = fake_kb
+    metadata = {"type": "test"}
+
+    # fake_kb wrote without hashes: the first pass stamps them
+    assert kb.add_changed_documents(["doc_0"], [documents[0]], [metadata]) == 1
+    assert kb.add_changed_documents(["doc_1"], [documents[1]], [metadata]) == 1
+
+    # Same content as stored: nothing is re-embedded by either writer
+    assert kb.add_changed_documents(["doc_0"], [documents[0]], [metadata]) == 0
+    batcher = UpsertBatcher(kb)
+    assert batcher.add("doc_1", documents[1], metadata)
+    assert batcher.flush() == 0
+
+    assert kb.add_changed_documents(["doc_0"], ["edited"], [metadata]) == 1
+    assert batcher.add("doc_1", "edited too", metadata)
+    assert batcher.flush() == 1
+
+
+@pytest.mark.parametrize(
+    "raw", [b"", b"unix\nlines\n", b"windows\r\nlines\r\n", b"old mac\rlines\r"]
+)
+def test_read_text_translates_newlines_like_text_mode(fake_kb, tmp_path, raw):
+    kb, _ = fake_kb
+    path = tmp_path / "skills.txt"
+    path.write_bytes(raw)
+
+    with open(path, "r", encoding="utf-8") as f:
+        assert kb._read_text(str(path)) == f.read()
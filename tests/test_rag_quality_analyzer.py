@@ -0,0 +1,23 @@
+"""
+RAG Quality Analyzer Tests
+Legacy string OCR confidence rows, including malformed ones
+"""
+
+import pytest
+
+from rag_quality_analyzer import RAGQualityAnalyzer
+
+
+@pytest.mark.parametrize(
+    "metadata, low",
+    [
+        ({"ocr_confidence": "42.5"}, True),  # Legacy string row
+        ({"ocr_confidence": "91"}, False),
+        ({"ocr_confidence": "n/a"}, False),  # Malformed: must not abort
+        ({"ocr_confidence": 42.5}, False),  # Numeric rows use Chroma's filter
+        ({}, False),
+    ],
+)
+def test_low_legacy_ocr_tolerates_malformed_values(metadata, low):
+    assert RAGQualityAnalyzer._low_legacy_ocr(metadata) is low
+    RAGQualityAnalyzer._quality_issues(10, metadata)  # Must not raise either
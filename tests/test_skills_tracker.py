@@ -0,0 +1,107 @@
+"""
+Skills Tracker Tests
+Skill lists from old (joined string) and new (list) metadata rows
+"""
+
+import pytest
+
+from skills_tracker import SkillsTracker
+
+
+class StubCollection:
+    """Just enough of a Chroma collection for SkillsTracker queries"""
+
+    def __init__(self, rows):
+        self.rows = rows  # (id, metadata) pairs
+
+    def get(self, where, include):
+        matched = [(i, m) for i, m in self.rows if m.get("type") == where["type"]]
+        return {
+            "ids": [i for i, _ in matched],
+            "metadatas": [m for _, m in matched],
+        }
+
+    def count(self):
+        return len(self.rows)
+
+
+class StubKB:
+    index_generation = 0
+
+    def __init__(self, rows):
+        self.collection = StubCollection(rows)
+
+
+@pytest.fixture
+def make_tracker(isolated_config):
+    """SkillsTracker over stub rows (history file lands in tmp_path)"""
+    return lambda rows: SkillsTracker(StubKB(rows))
+
+
+@pytest.mark.parametrize(
+    "metadata, expected",
+    [
+        ({"skills": "Python, SQL"}, ["Python", "SQL"]),  # Pre-list rows
+        ({"skills": "Python"}, ["Python"]),
+        ({"skills": ["Python", "SQL"]}, ["Python", "SQL"]),
+        ({"skills": ""}, []),
+        ({}, []),
+    ],
+)
+def test_skill_list_reads_joined_strings_and_lists(metadata, expected):
+    assert SkillsTracker._skill_list(metadata) == expected
+
+
+def test_practiced_skills_count_mixed_row_formats(make_tracker):
+    tracker = make_tracker(
+        [
+            ("d1", {"type": "daily_note", "skills": "Python, SQL"}),
+            ("d2", {"type": "daily_note", "skills": ["Python", "pandas"]}),
+            ("d3", {"type": "daily_note"}),
+            ("s1", {"type": "skill_note", "skills": ["Ignored"]}),
+        ]
+    )
+
+    assert tracker.extract_practiced_skills() == {
+        "Python": 2,
+        "SQL": 1,
+        "pandas": 1,
+    }
+
+
+def test_skill_names_strip_only_a_trailing_md(make_tracker):
+    tracker = make_tracker(
+        [
+            ("n1", {"type": "skill_note", "source": "Python.md", "proficiency": 7}),
+            # Not a character set: rstrip(".md") would leave "Frau"
+            ("n2", {"type": "skill_note", "source": "Fraud.md"}),
+            ("n3", {"type": "skill_note", "source": "markdown_parser"}),
+            ("n4", {"type": "skill_note"}),  # No source: fall back to the id
+        ]
+    )
+
+    skills = tracker.extract_all_skills()
+
+    assert set(skills) == {"Python", "Fraud", "markdown_parser", "n4"}
+    assert skills["Python"]["proficiency"] == 7
+    assert skills["markdown_parser"]["category"] == "general"
+
+
+def test_skills_cache_follows_index_generation(make_tracker):
+    tracker = make_tracker([("n1", {"type": "skill_note", "source": "SQL.md"})])
+    assert set(tracker.extract_all_skills()) == {"SQL"}
+
+    # An upsert keeps count() but bumps the generation
+    tracker.kb.collection.rows[0] = ("n1", {"type": "skill_note", "source": "Git.md"})
+    assert set(tracker.extract_all_skills()) == {"SQL"}  # Still memoized
+    tracker.kb.index_generation += 1
+    assert set(tracker.extract_all_skills()) == {"Git"}
+
+
+def test_updates_are_written_on_flush(make_tracker, isolated_config):
+    tracker = make_tracker([])
+    tracker.update_skill_history("Python", 6)
+    assert not (isolated_config / tracker.history_file).exists()
+
+    tracker.flush()
+    assert make_tracker([]).history["Python"][0]["proficiency"] == 6
@@ -0,0 +1,26 @@
+"""
+Text Utilities Tests
+count_words must agree with len(text.split()) on any whitespace
+"""
+
+import pytest
+
+from text_utils import count_words
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "   ",
+        "one",
+        "  leading and trailing  ",
+        "tabs\tand\nnewlines\r\nmixed",
+        "a\xa0b c d",  # No-break space, common in PDF text
+        "a\u2003b\u2003c\u2003d",  # Em spaces
+        "thin\u2009space and\u3000ideographic",
+        "séparateurs\x1cunit\x1fsep",
+    ],
+)
+def test_count_words_matches_str_split(text):
+    assert count_words(text) == len(text.split())